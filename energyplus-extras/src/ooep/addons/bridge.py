@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import typing
+import os
+import json
+import struct
+import socket
+import tempfile
+import multiprocessing.shared_memory
+
+import numpy as np
+
+
+# TODO NOTE shared memory layout (fixed; native byte order):
+# | header: uint64[2] (<step>, <done>) | observations: float64[n] | actions: float64[m] |
+# actions that are NaN are not written
+class Layout(typing.NamedTuple):
+    shm_name: str
+    observations: typing.Sequence[str]
+    actions: typing.Sequence[str]
+
+    _header_size = 2 * np.dtype(np.uint64).itemsize
+
+    @property
+    def size(self):
+        return (
+            self._header_size
+            + (len(self.observations) + len(self.actions))
+                * np.dtype(np.float64).itemsize
+        )
+
+    def views(self, buf):
+        n_obs, n_act = len(self.observations), len(self.actions)
+        header = np.ndarray((2,), dtype=np.uint64, buffer=buf)
+        observations = np.ndarray(
+            (n_obs,), dtype=np.float64, buffer=buf,
+            offset=self._header_size
+        )
+        actions = np.ndarray(
+            (n_act,), dtype=np.float64, buffer=buf,
+            offset=self._header_size + observations.nbytes
+        )
+        return header, observations, actions
+
+    # TODO NOTE wire format: <length: uint32> <json>
+    def send(self, conn: socket.socket):
+        b = json.dumps(self._asdict()).encode()
+        conn.sendall(struct.pack('!I', len(b)) + b)
+
+    @classmethod
+    def recv(cls, conn: socket.socket) -> 'Layout':
+        def _recv_exactly(n):
+            b = bytearray()
+            while len(b) < n:
+                chunk = conn.recv(n - len(b))
+                if not chunk:
+                    raise ConnectionError('connection closed by the server')
+                b.extend(chunk)
+            return bytes(b)
+
+        n, = struct.unpack('!I', _recv_exactly(struct.calcsize('!I')))
+        return cls(**json.loads(_recv_exactly(n)))
+
+# TODO NOTE handshake: one byte per message over a unix socket
+_MSG_STEP = b'\x01'
+_MSG_DONE = b'\x00'
+
+class Server:
+    """
+    Simulation side of the bridge.
+
+    Exposes the values of `observations` and the `actions` (actuators)
+    of an `ooep.ems.Environment` to a `Client` in another process.
+    On each dispatch of `event_specs`, the observations are written to
+    shared memory and the client is signaled; the simulation then waits
+    for the client's actions.
+
+    Examples
+    --------
+    >>> server = Server(env, [tmeter, emeter], [tstat_heat, tstat_cool])
+    >>> server.accept()     # blocks until a client attaches
+    >>> env(...)
+    >>> server.close()
+    """
+
+    def __init__(
+        self,
+        env: 'ooep.ems.Environment',
+        observations: typing.Sequence['ooep.ems.BaseEnvironment.DataComponent'],
+        actions: typing.Sequence['ooep.ems.BaseEnvironment.Actuator'],
+        event_specs: typing.Mapping = dict(
+            event_name='begin_zone_timestep_after_init_heat_balance'
+        ),
+        address: str | os.PathLike = None,
+        skip_warmup: bool = True
+    ):
+        self._env = env
+        self._observations = [*observations]
+        self._actions = [*actions]
+        self._skip_warmup = skip_warmup
+
+        layout = Layout(
+            shm_name=None,
+            observations=[c.name for c in self._observations],
+            actions=[c.name for c in self._actions]
+        )
+        self._shm = multiprocessing.shared_memory.SharedMemory(
+            create=True, size=layout.size
+        )
+        self.layout = layout._replace(shm_name=self._shm.name)
+        self._header, self._obs, self._act = self.layout.views(self._shm.buf)
+        self._header[:] = 0
+        self._act[:] = np.nan
+
+        self._tmpdir = None
+        if address is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='ooep-bridge-')
+            address = os.path.join(self._tmpdir, 'sock')
+        self.address = os.fspath(address)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.address)
+        self._listener.listen(1)
+        self._conn = None
+
+        self._event_specs = event_specs
+        self._env.event_listener.subscribe(self._event_specs, self._step)
+
+    def accept(self, timeout: float = None):
+        self._listener.settimeout(timeout)
+        self._conn, _ = self._listener.accept()
+        self._conn.setblocking(True)
+        self.layout.send(self._conn)
+        return self
+
+    def _step(self):
+        if self._conn is None:
+            return
+        if self._skip_warmup and self._env.warming_up:
+            return
+
+        try:
+            for i, c in enumerate(self._observations):
+                self._obs[i] = c.value
+        except self._env.Component.NotReadyError:
+            return
+
+        self._header[0] += 1
+        try:
+            self._conn.sendall(_MSG_STEP)
+            reply = self._conn.recv(1)
+        # NOTE e.g. `BrokenPipeError`, `ConnectionResetError`: the client died
+        except OSError:
+            reply = None
+        if reply != _MSG_STEP:
+            # client gone: detach and let the simulation go on
+            self._conn.close()
+            self._conn = None
+            return
+
+        for actuator, value in zip(self._actions, self._act):
+            if np.isnan(value):
+                continue
+            actuator.value = float(value)
+
+    def close(self):
+        self._env.event_listener.unsubscribe(self._event_specs, self._step)
+        self._header[1] = 1
+        if self._conn is not None:
+            try: self._conn.sendall(_MSG_DONE)
+            except OSError: pass
+            self._conn.close()
+            self._conn = None
+        self._listener.close()
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        if self._tmpdir is not None:
+            os.rmdir(self._tmpdir)
+        del self._header, self._obs, self._act
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_args):
+        self.close()
+
+class Client:
+    """
+    External side of the bridge; does not require EnergyPlus.
+
+    Examples
+    --------
+    >>> with Client(address) as client:
+    ...     for obs in client:
+    ...         client.act(policy(obs))
+    """
+
+    def __init__(self, address: str | os.PathLike, timeout: float = None):
+        self._conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._conn.settimeout(timeout)
+        self._conn.connect(os.fspath(address))
+        self._conn.settimeout(None)
+
+        self.layout = Layout.recv(self._conn)
+
+        try:
+            self._shm = multiprocessing.shared_memory.SharedMemory(
+                name=self.layout.shm_name, track=False
+            )
+        except TypeError:
+            # NOTE python < 3.13: keep the resource tracker
+            # from unlinking the server's block at exit
+            from multiprocessing import resource_tracker
+            self._shm = multiprocessing.shared_memory.SharedMemory(
+                name=self.layout.shm_name
+            )
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self._header, self._obs, self._act = self.layout.views(self._shm.buf)
+
+    @property
+    def step(self) -> int:
+        return int(self._header[0])
+
+    @property
+    def done(self) -> bool:
+        return bool(self._header[1])
+
+    def observe(self) -> np.ndarray | None:
+        """
+        Wait for the next step.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            The observations (a view of the shared memory; copy to keep),
+            or `None` when the simulation is done.
+        """
+        msg = self._conn.recv(1)
+        if msg != _MSG_STEP:
+            return None
+        return self._obs
+
+    def act(self, actions: typing.Sequence[float] = None):
+        """
+        Write the actions and resume the simulation.
+
+        Parameters
+        ----------
+        actions : Sequence[float], optional
+            One value per actuator; NaN (or `None` for all)
+            leaves the actuator untouched.
+        """
+        self._act[:] = np.nan if actions is None else actions
+        self._conn.sendall(_MSG_STEP)
+
+    def __iter__(self):
+        while (obs := self.observe()) is not None:
+            yield obs
+
+    def close(self):
+        self._conn.close()
+        del self._header, self._obs, self._act
+        self._shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_args):
+        self.close()
+
+__all__ = [
+    Layout,
+    Server,
+    Client
+]
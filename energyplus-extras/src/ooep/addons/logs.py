@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import re
+import typing
+import collections
+
+
+class Record(typing.NamedTuple):
+    # NOTE sequence number of the message since the start of the capture
+    index: int
+    # NOTE `None`, or of the error (and its continuation lines): 'Warning', 'Severe', 'Fatal'
+    severity: str | None
+    text: str
+
+# TODO NOTE energyplus error lines: `** Warning **`, `** Severe  **`, `**  Fatal  **`;
+# continuation lines: `**   ~~~   **`
+_severity_pattern = re.compile(rb'\*\*\s*(Warning|Severe|Fatal|~~~)\s*\*\*')
+_severities = ('Warning', 'Severe', 'Fatal')
+
+class Log:
+    """
+    Capture of the `message` events of an `ooep.ems.Environment`.
+
+    The callback only appends the raw bytes to a ring buffer of the last
+    `capacity` messages; decoding, classification and indexing by severity
+    are done lazily, on access.
+
+    Parameters
+    ----------
+    env : ooep.ems.Environment
+        The environment.
+    capacity : int
+        Number of messages to keep.
+    stop_on : str, optional
+        Stop the simulation at the first message of this severity or above:
+        'Warning', 'Severe' or 'Fatal'.
+
+    Examples
+    --------
+    >>> log = Log(env, stop_on='Severe')
+    >>> env(...)
+    >>> if log.triggered is not None:
+    ...     print(log.triggered.text)
+    >>> log.errors('Severe')
+    """
+
+    def __init__(
+        self,
+        env: 'ooep.ems.Environment',
+        capacity: int = 1 << 16,
+        stop_on: str = None
+    ):
+        self._env = env
+        # NOTE (<index>, <message>): each message carries its index
+        # so that a copy of the buffer is consistent on its own
+        self._messages: typing.Deque[typing.Tuple[int, bytes]] = collections.deque(maxlen=capacity)
+        self._n_messages = 0
+
+        self._records: typing.Deque[Record] = collections.deque(maxlen=capacity)
+        self._n_records = 0
+        self._severity_index: typing.Dict[str, typing.Deque[int]] = {
+            severity: collections.deque() for severity in _severities
+        }
+        self._severity = None
+
+        # NOTE plain substring search on the hot path
+        self._stop_patterns = (
+            None if stop_on is None else
+            (b'** Warning **', b'** Severe  **', b'**  Fatal  **')
+                [_severities.index(stop_on):]
+        )
+        self._triggered = None
+
+        self._event_specs = dict(event_name='message')
+        self._env.event_listener.subscribe(self._event_specs, self._on_message)
+
+    def _on_message(self, message: bytes):
+        i = self._n_messages
+        self._messages.append((i, message))
+        self._n_messages = i + 1
+        if self._stop_patterns is not None and self._triggered is None:
+            for p in self._stop_patterns:
+                if p in message:
+                    self._triggered = i
+                    self._env.stop()
+                    break
+
+    def _parse(self):
+        # NOTE a snapshot: the buffer may be appended to (by the energyplus thread)
+        # while parsing; `list` copies it without releasing the GIL
+        messages = list(self._messages)
+        for i, message in messages:
+            if i < self._n_records:
+                continue
+            if i > self._n_records:
+                # NOTE messages overwritten before parsing are lost:
+                # keep the records contiguous
+                self._records.clear()
+                self._severity = None
+            m = _severity_pattern.search(message)
+            if m is None:
+                self._severity = None
+            elif m.group(1) != b'~~~':
+                self._severity = m.group(1).decode()
+            if self._severity is not None:
+                self._severity_index[self._severity].append(i)
+            self._records.append(Record(
+                index=i,
+                severity=self._severity,
+                text=message.decode(errors='replace').rstrip()
+            ))
+            self._n_records = i + 1
+
+        first = self._n_records - len(self._records)
+        for index in self._severity_index.values():
+            while index and index[0] < first:
+                index.popleft()
+
+    def _record(self, i: int) -> Record:
+        j = i - (self._n_records - len(self._records))
+        if not 0 <= j < len(self._records):
+            raise IndexError(f'message {i} no longer retained')
+        return self._records[j]
+
+    @property
+    def records(self) -> typing.Sequence[Record]:
+        self._parse()
+        return self._records
+
+    def errors(self, severity: str = 'Warning') -> typing.List[Record]:
+        """
+        The (retained) messages of `severity` or above, in order.
+        """
+        self._parse()
+        return [
+            self._record(i)
+                for i in sorted(
+                    i for s in _severities[_severities.index(severity):]
+                        for i in self._severity_index[s]
+                )
+        ]
+
+    def counts(self) -> typing.Dict[str, int]:
+        self._parse()
+        return {
+            severity: len(self._severity_index[severity])
+                for severity in _severities
+        }
+
+    @property
+    def triggered(self) -> Record | None:
+        """
+        The message that stopped the simulation (see `stop_on`), if any.
+        """
+        if self._triggered is None:
+            return None
+        self._parse()
+        try: return self._record(self._triggered)
+        except IndexError: return None
+
+    @property
+    def n_dropped(self) -> int:
+        return self._n_messages - len(self._messages)
+
+    def clear(self):
+        self._messages.clear()
+        self._records.clear()
+        for index in self._severity_index.values():
+            index.clear()
+        self._n_messages = self._n_records = 0
+        self._severity = self._triggered = None
+
+    def close(self):
+        self._env.event_listener.unsubscribe(self._event_specs, self._on_message)
+        return self
+
+    def __str__(self):
+        return str.join('\n', (r.text for r in self.records))
+
+__all__ = [
+    Record,
+    Log
+]
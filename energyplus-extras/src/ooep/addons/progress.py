@@ -8,9 +8,9 @@ from .. import ems
 
 
 class BaseProgressBar(tqdm.auto.tqdm):
+    # TODO NOTE `update` only refreshes every `mininterval` seconds
     def update_to(self, n):
-        self.n = n
-        self.refresh()
+        return self.update(n - self.n)
 
 class ProgressBar(BaseProgressBar):
     def __init__(self, env: ems.Environment, **tqdm_kwargs):
@@ -24,7 +24,7 @@ class ProgressBar(BaseProgressBar):
             )
             .subscribe(
                 dict(event_name='message'),
-                lambda s: self.set_postfix_str(s.decode())
+                lambda s: self.set_postfix_str(s.decode(), refresh=False)
             )
         )
 
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import sys
+import json
+import time
+import typing
+import datetime
+import threading
+
+
+# TODO NOTE nothing here does I/O on the energyplus thread:
+# `Probe` callbacks only update counters; `Monitor` (and `Publisher`)
+# sample them from a thread of their own
+
+class Sample(typing.NamedTuple):
+    name: str
+    # NOTE `time.monotonic` of the sample
+    wall_time: float
+    elapsed: float
+    timesteps: int
+    sim_time: datetime.datetime | None
+    warming_up: bool
+    # NOTE percent
+    progress: float
+    callback_time: float
+    done: bool
+
+class Probe:
+    """
+    Counters of an `ooep.ems.Environment` run.
+
+    Parameters
+    ----------
+    env : ooep.ems.Environment
+        The environment.
+    name : str, optional
+        Identifies the run in a `Monitor`.
+    sample_every : int
+        Read the simulation time every this many timesteps.
+    """
+
+    def __init__(
+        self,
+        env: 'ooep.ems.Environment',
+        name: str = None,
+        sample_every: int = 16
+    ):
+        self._env = env
+        self.name = name if name is not None else f'{id(env):x}'
+        self._sample_every = sample_every
+
+        self._t_start = None
+        self._callback_time_start = 0.
+        self._timesteps = 0
+        self._sim_time = None
+        self._warming_up = True
+        self._progress = 0.
+        self._done = False
+
+        self._event_specs = [
+            (dict(event_name='begin_new_environment'), self._on_begin),
+            (dict(event_name='end_zone_timestep_after_zone_reporting'), self._on_timestep),
+            (dict(event_name='progress'), self._on_progress)
+        ]
+        for event_specs, callback in self._event_specs:
+            self._env.event_listener.subscribe(event_specs, callback)
+
+    def _on_begin(self):
+        if self._t_start is None:
+            self._t_start = time.monotonic()
+            self._callback_time_start = getattr(self._env, 'callback_time', 0.)
+
+    def _on_timestep(self):
+        self._timesteps += 1
+        if self._timesteps % self._sample_every == 0:
+            self._sim_time = self._env.datetime
+            self._warming_up = self._env.warming_up
+
+    def _on_progress(self, n: int):
+        self._progress = float(n)
+        if n >= 100:
+            self._done = True
+
+    def snapshot(self) -> Sample:
+        t = time.monotonic()
+        return Sample(
+            name=self.name,
+            wall_time=t,
+            elapsed=0. if self._t_start is None else t - self._t_start,
+            timesteps=self._timesteps,
+            sim_time=self._sim_time,
+            warming_up=self._warming_up,
+            progress=self._progress,
+            callback_time=(
+                getattr(self._env, 'callback_time', 0.)
+                - self._callback_time_start
+            ),
+            done=self._done
+        )
+
+    def close(self):
+        self._done = True
+        for event_specs, callback in self._event_specs:
+            self._env.event_listener.unsubscribe(event_specs, callback)
+        return self
+
+class Summary(typing.NamedTuple):
+    n_runs: int
+    n_done: int
+    # NOTE percent; mean over the runs
+    progress: float
+    timesteps_per_sec: float
+    # NOTE simulated seconds per wall-clock second
+    sim_speed: float
+    # NOTE fraction of the wall-clock time spent in callbacks
+    callback_overhead: float
+    # NOTE seconds; of the slowest run
+    eta: float | None
+
+class Monitor:
+    """
+    Aggregate `Probe` samples into a summary rendered every `interval` seconds.
+
+    Samples come from local probes (`add`) and from other processes
+    (`Publisher` on `queue`). Rendering is done by a background thread.
+
+    Parameters
+    ----------
+    interval : float
+        Seconds between renders.
+    render : str or Callable[[Summary], Any]
+        `'bar'` for a (tqdm) progress bar; `'json'` for JSON lines to `stream`;
+        or a function of each `Summary`.
+    stream : TextIO
+        Where to render.
+
+    Examples
+    --------
+    >>> with Monitor(render='bar') as monitor:
+    ...     monitor.add(Probe(env))
+    ...     env(...)
+    """
+
+    def __init__(
+        self,
+        interval: float = .5,
+        render: str | typing.Callable[[Summary], typing.Any] = 'bar',
+        stream: typing.TextIO = None
+    ):
+        self.interval = interval
+        self._stream = stream if stream is not None else sys.stderr
+        self._render = {
+            'bar': self._render_bar,
+            'json': self._render_json
+        }.get(render, render)
+        self._bar = None
+
+        self._probes: typing.List[Probe] = []
+        self._queue = None
+        self._samples: typing.Dict[str, Sample] = dict()
+        self._rates: typing.Dict[str, typing.Tuple[float, float]] = dict()
+
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, *probes: Probe):
+        self._probes.extend(probes)
+        return self
+
+    @property
+    def queue(self) -> 'multiprocessing.Queue':
+        # NOTE pass to the `Publisher`s of the worker processes
+        if self._queue is None:
+            import multiprocessing
+            self._queue = multiprocessing.Queue()
+        return self._queue
+
+    def _collect(self):
+        samples = [probe.snapshot() for probe in self._probes]
+        if self._queue is not None:
+            import queue
+            try:
+                while True:
+                    samples.append(Sample(*self._queue.get_nowait()))
+            except queue.Empty:
+                pass
+
+        for s in samples:
+            prev = self._samples.get(s.name)
+            if prev is not None and s.wall_time > prev.wall_time:
+                dt = s.wall_time - prev.wall_time
+                sim_dt = (
+                    (s.sim_time - prev.sim_time).total_seconds()
+                    if s.sim_time is not None and prev.sim_time is not None
+                    and not s.warming_up and not prev.warming_up else 0.
+                )
+                self._rates[s.name] = (
+                    (s.timesteps - prev.timesteps) / dt,
+                    max(sim_dt, 0.) / dt
+                )
+            self._samples[s.name] = s
+
+    def summary(self) -> Summary:
+        self._collect()
+        samples = [*self._samples.values()]
+        running = [s for s in samples if not s.done]
+        rates = [self._rates[s.name] for s in running if s.name in self._rates]
+
+        etas = [
+            s.elapsed * (100. - s.progress) / s.progress
+                for s in running if s.progress > 0
+        ]
+        elapsed = sum(s.elapsed for s in samples)
+        return Summary(
+            n_runs=len(samples),
+            n_done=len(samples) - len(running),
+            progress=(
+                sum(100. if s.done else s.progress for s in samples) / len(samples)
+                if samples else 0.
+            ),
+            timesteps_per_sec=sum(r[0] for r in rates),
+            sim_speed=sum(r[1] for r in rates),
+            callback_overhead=(
+                sum(s.callback_time for s in samples) / elapsed
+                if elapsed > 0 else 0.
+            ),
+            eta=max(etas) if etas and len(etas) == len(running) else None
+        )
+
+    def _render_bar(self, summary: Summary):
+        if self._bar is None:
+            from . import OptionalImportError
+            try: import tqdm.auto
+            except ImportError as e:
+                raise OptionalImportError.suggest(['tqdm']) from e
+            self._bar = tqdm.auto.tqdm(
+                total=100., file=self._stream,
+                bar_format='{l_bar}{bar}| {n:.0f}/{total:.0f}% [{elapsed}{postfix}]'
+            )
+        self._bar.n = summary.progress
+        self._bar.set_postfix_str(
+            f'runs={summary.n_done}/{summary.n_runs}, '
+            f'{summary.timesteps_per_sec:.0f} steps/s, '
+            f'{summary.sim_speed / 3600:.1f} sim-h/s, '
+            f'callbacks={summary.callback_overhead:.0%}, '
+            f'''eta={
+                '?' if summary.eta is None else
+                datetime.timedelta(seconds=int(summary.eta))
+            }''',
+            refresh=False
+        )
+        self._bar.refresh()
+
+    def _render_json(self, summary: Summary):
+        self._stream.write(json.dumps(dict(time=time.time(), **summary._asdict())) + '\n')
+        self._stream.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._render(self.summary())
+        self._render(self.summary())
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc_args):
+        self.stop()
+
+class Publisher:
+    """
+    Send the samples of `probes` to a `Monitor` of another process
+    every `interval` seconds (from a background thread).
+
+    Examples
+    --------
+    >>> # in the worker; `queue` is `monitor.queue` of the parent
+    >>> with Publisher(queue, Probe(env, name=job_key)):
+    ...     env(...)
+    """
+
+    def __init__(
+        self,
+        queue: 'multiprocessing.Queue',
+        *probes: Probe,
+        interval: float = .5
+    ):
+        self._queue = queue
+        self._probes = probes
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _publish(self):
+        for probe in self._probes:
+            self._queue.put(tuple(probe.snapshot()))
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._publish()
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for probe in self._probes:
+            probe.close()
+        self._publish()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc_args):
+        self.stop()
+
+__all__ = [
+    Sample,
+    Probe,
+    Summary,
+    Monitor,
+    Publisher
+]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import abc
+import typing
+import functools
+import dataclasses
+import collections
+
+import pandas as pd
+
+
+# TODO NOTE the component and event surface shared by `ooep.ems` and `ooep.surrogate`;
+# this module does not require energyplus (nor import `ooep.utils`, which locates it)
+
+class NotReadyError(Exception):
+    pass
+
+class Component(abc.ABC):
+    # NOTE components are interned by the environment: keep them compact
+    __slots__ = ('_specs', '_env')
+
+    class NotReadyError(NotReadyError):
+        pass
+
+    class Specs(typing.NamedTuple):
+        ...
+
+    def __init__(
+        self,
+        specs: Specs | typing.Mapping,
+        environment: typing.Any
+    ):
+        self._specs = (
+            specs
+            if isinstance(specs, self.Specs)
+            else
+            self.Specs(**specs)
+        )
+        self._env = environment
+
+    @property
+    def specs(self):
+        return self._specs
+
+    @property
+    def name(self):
+        return str.join(' | ', self.specs)
+
+class ComponentRegistry:
+    # TODO NOTE registry of interned components: {(<component_type>, <specs>): <component>}
+    @functools.cached_property
+    def _components(self) -> typing.Dict[
+        typing.Tuple[typing.Type[Component], Component.Specs],
+        Component
+    ]:
+        return dict()
+
+    def _component(
+        self,
+        specs: typing.Mapping | Component.Specs | pd.DataFrame,
+        component_type: typing.Type[Component]
+    ):
+        def _intern(specs):
+            if not isinstance(specs, component_type.Specs):
+                specs = component_type.Specs(**specs)
+            key = (component_type, specs)
+            c = self._components.get(key)
+            if c is None:
+                c = self._components[key] = component_type(specs, environment=self)
+            return c
+
+        if isinstance(specs, pd.DataFrame):
+            return pd.DataFrame.apply(specs, _intern, axis='columns')
+        return _intern(specs)
+
+class EventListener:
+    @dataclasses.dataclass
+    class Data:
+        # NOTE as `ooep.utils.containers.CallableSet`
+        class CallableSet(collections.OrderedDict):
+            def add(self, v):
+                self[v] = v
+
+            def remove(self, v):
+                return self.pop(v)
+
+            # TODO NOTE return the last value instead of all the values
+            # in case the energyplus api requires it;
+            # the other values are not collected
+            def __call__(self, *args, **kwargs):
+                res = None
+                # NOTE callbacks may unsubscribe (themselves) while dispatched
+                for f in [*self.values()]:
+                    res = f(*args, **kwargs)
+                return res
+
+        callbacks: CallableSet \
+            = dataclasses.field(default_factory=CallableSet)
+
+    def __init__(self, env):
+        self._env = env
+        self._event_data: typing.Mapping[typing.Any, self.Data] \
+            = collections.defaultdict(self.Data)
+
+    def subscribe(
+        self,
+        event_specs: typing.Mapping | typing.NamedTuple,
+        *callbacks: typing.Callable
+    ):
+        if not isinstance(event_specs, self._env.Event.Specs):
+            event_specs = self._env.Event.Specs(**event_specs)
+
+        c = self._event_data[event_specs].callbacks
+        for callback in callbacks:
+            c.add(callback)
+        self._env.event(event_specs).callback = c
+
+        return self
+
+    def unsubscribe(
+        self,
+        event_specs: typing.Mapping | typing.NamedTuple,
+        *callbacks: typing.Callable
+    ):
+        if not isinstance(event_specs, self._env.Event.Specs):
+            event_specs = self._env.Event.Specs(**event_specs)
+
+        for callback in callbacks:
+            self._event_data[event_specs].callbacks.remove(callback)
+
+        return self
+
+    def sync(self):
+        for event_specs, data in self._event_data.items():
+            self._env.event(event_specs).callback = data.callbacks
+
+        return self
+
+__all__ = [
+    NotReadyError,
+    Component,
+    ComponentRegistry,
+    EventListener
+]
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import typing
+import datetime
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class Controller(typing.NamedTuple):
+    # NOTE {<event name or `Event.Specs`>: <callback>}
+    callbacks: typing.Mapping[typing.Any, typing.Callable]
+    name: str | None = None
+
+class Segment(typing.NamedTuple):
+    version: int
+    name: str | None
+    # NOTE number of zone timesteps (boundaries) before the activation
+    timestep: int
+    # NOTE `None` if activated before the run
+    datetime: datetime.datetime | None
+    warming_up: bool
+
+class _Request:
+    __slots__ = ('at', 'number', 'next')
+
+    def __init__(self, at: datetime.datetime | None, number: int | None):
+        self.at = at
+        self.number = number
+        self.next: _Request | None = None
+
+class _Version(typing.NamedTuple):
+    number: int
+    name: str | None
+    callbacks: typing.Mapping['ooep.ems.BaseEnvironment.Event.Specs', typing.Callable]
+
+# TODO NOTE the energyplus thread never takes a lock:
+# swaps are linked to the tail of a queue (under a lock of the callers only), which
+# only the energyplus thread consumes at zone timestep boundaries by following `next`;
+# the dispatchers then read the active version in a single attribute lookup
+class Registry:
+    """
+    Versioned sets of callbacks (controllers) of an `ooep.ems.Environment`,
+    swapped atomically between zone timesteps, mid-run.
+
+    All the callbacks of a zone timestep are of one version; the activations
+    (which version, from which timestep on) are recorded as `segments`
+    to label recorded data (`annotate`).
+
+    Parameters
+    ----------
+    env : ooep.ems.Environment
+        The environment.
+    controller : Controller or Mapping, optional
+        The initial controller; active from the start of the run.
+    boundary : str
+        The event at which swaps take effect; the first of each zone timestep.
+
+    Examples
+    --------
+    >>> registry = Registry(env, Controller({'begin_zone_timestep_after_init_heat_balance': pid_a}, name='a'))
+    >>> registry.swap(Controller({...: pid_b}, name='b'), at=datetime.datetime(2006, 4, 1))
+    >>> registry.swap(Controller({...: pid_c}, name='c'), at=datetime.datetime(2006, 7, 1))
+    >>> env(...)
+    >>> registry.annotate(recorder.to_frame()).groupby('controller_version').mean()
+    """
+
+    def __init__(
+        self,
+        env: 'ooep.ems.Environment',
+        controller: Controller | typing.Mapping = None,
+        boundary: str = 'begin_zone_timestep_before_set_current_weather'
+    ):
+        self._env = env
+        self._boundary = env.Event.Specs(boundary)
+
+        self._versions: typing.Dict[int, _Version] = dict()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+        # NOTE the last consumed request (a sentinel at first) and the last requested
+        self._head = self._tail = _Request(None, None)
+        self._n_timesteps = 0
+        self._segments: typing.List[Segment] = []
+
+        self._active = _Version(number=None, name=None, callbacks=dict())
+        self._dispatchers: typing.Dict['ooep.ems.BaseEnvironment.Event.Specs', typing.Callable] = dict()
+        self._subscribe(self._boundary, self._on_boundary)
+
+        if controller is not None:
+            self._activate(self.register(controller))
+
+    def _event_specs(self, key):
+        Specs = self._env.Event.Specs
+        if isinstance(key, Specs):
+            return key
+        if isinstance(key, str):
+            return Specs(key)
+        return Specs(*key)
+
+    def register(self, controller: Controller | typing.Mapping) -> int:
+        """
+        Add `controller` as a new version, without activating it.
+
+        Returns
+        -------
+        int
+            The version number.
+        """
+        if not isinstance(controller, Controller):
+            controller = Controller(controller)
+        with self._lock:
+            number = next(self._counter)
+            self._versions[number] = _Version(
+                number=number,
+                name=controller.name,
+                callbacks={
+                    self._event_specs(key): callback
+                        for key, callback in controller.callbacks.items()
+                }
+            )
+        return number
+
+    def swap(
+        self,
+        controller: Controller | typing.Mapping | int,
+        at: datetime.datetime = None
+    ) -> int:
+        """
+        Activate `controller` (or a registered version) at the next zone timestep,
+        or at the first one (after warmup) from the simulation time `at` on.
+        Swaps take effect in order. Safe to call from any thread.
+
+        Returns
+        -------
+        int
+            The version number.
+        """
+        number = (
+            controller if isinstance(controller, int) else
+            self.register(controller)
+        )
+        if number not in self._versions:
+            raise KeyError(f'unknown controller version: {number}')
+        request = _Request(at, number)
+        with self._lock:
+            self._tail.next = request
+            self._tail = request
+        return number
+
+    def _subscribe(self, event_specs, callback):
+        self._dispatchers[event_specs] = callback
+        self._env.event_listener.subscribe(event_specs, callback)
+
+    def _dispatcher(self, event_specs):
+        def _dispatch(*args, **kwargs):
+            f = self._active.callbacks.get(event_specs)
+            if f is not None:
+                return f(*args, **kwargs)
+        return _dispatch
+
+    def _activate(self, number: int, running: bool = False):
+        version = self._versions[number]
+        # NOTE on the energyplus thread while running:
+        # the callback sets of the other events are not being iterated
+        for event_specs in version.callbacks.keys():
+            if event_specs not in self._dispatchers:
+                self._subscribe(event_specs, self._dispatcher(event_specs))
+        self._segments.append(Segment(
+            version=number,
+            name=version.name,
+            timestep=self._n_timesteps,
+            datetime=self._env.datetime if running else None,
+            warming_up=bool(self._env.warming_up) if running else True
+        ))
+        self._active = version
+
+    def _on_boundary(self, *args, **kwargs):
+        # NOTE of the swaps due, only the last takes effect
+        head = self._head
+        request = head.next
+        while request is not None:
+            if request.at is not None and (
+                self._env.warming_up
+                or self._env.datetime < request.at
+            ):
+                break
+            head, request = request, request.next
+        if head is not self._head:
+            self._activate(head.number, running=True)
+            self._head = head
+        self._n_timesteps += 1
+
+        f = self._active.callbacks.get(self._boundary)
+        if f is not None:
+            return f(*args, **kwargs)
+
+    @property
+    def version(self) -> int | None:
+        """
+        The number of the active version.
+        """
+        return self._active.number
+
+    @property
+    def pending(self) -> typing.List[typing.Tuple[datetime.datetime | None, int]]:
+        res = []
+        request = self._head.next
+        while request is not None:
+            res.append((request.at, request.number))
+            request = request.next
+        return res
+
+    @property
+    def segments(self) -> pd.DataFrame:
+        return pd.DataFrame(self._segments, columns=Segment._fields)
+
+    def annotate(
+        self,
+        frame: pd.DataFrame,
+        column: str = 'controller_version'
+    ) -> pd.DataFrame:
+        """
+        Add the version active at each row of `frame` (indexed by
+        simulation time, e.g. `ooep.surrogate.Recorder.to_frame`) as `column`.
+        Assumes the segments are of a single run (period).
+        """
+        # NOTE activations before the run or during warmup: from the start
+        starts = np.maximum.accumulate(np.asarray([
+            np.iinfo(np.int64).min if s.datetime is None or s.warming_up else
+            pd.Timestamp(s.datetime).value
+                for s in self._segments
+        ], dtype=np.int64))
+        versions = np.asarray([s.version for s in self._segments], dtype=np.int64)
+
+        # NOTE `.value` is in nanoseconds regardless of the unit (pandas >= 2);
+        # the index is converted likewise rather than with `as_unit` (pandas >= 2 only)
+        i = np.searchsorted(
+            starts,
+            pd.DatetimeIndex(frame.index).astype('datetime64[ns]').asi8,
+            side='right'
+        ) - 1
+        values = pd.array(np.full(len(i), pd.NA), dtype='Int64')
+        values[i >= 0] = versions[i[i >= 0]]
+        return frame.assign(**{column: values})
+
+    def close(self):
+        for event_specs, callback in self._dispatchers.items():
+            self._env.event_listener.unsubscribe(event_specs, callback)
+        self._dispatchers.clear()
+        return self
+
+__all__ = [
+    Controller,
+    Segment,
+    Registry
+]
@@ -5,20 +5,18 @@ import typing
 import collections
 import io
 import csv
+import time
 import datetime
 import functools
-import dataclasses
 
 import packaging
 import pandas as pd
 
-from . import utils
+from . import utils, components
+from .components import NotReadyError
 
 
-class NotReadyError(Exception):
-    pass
-
-class BaseEnvironment(abc.ABC):
+class BaseEnvironment(components.ComponentRegistry, abc.ABC):
     _target_ep_api_version = packaging.version.Version('0.2')
 
     @classmethod
@@ -36,6 +34,7 @@ class BaseEnvironment(abc.ABC):
 
     def __enter__(self):
         # TODO
+        self._clear_actuator_handles()
         if getattr(self, '_ep_state', None) is None:
             self._ep_state = self._ep_api.state_manager.new_state()
         else: self._ep_api.state_manager.reset_state(self._ep_state)
@@ -56,9 +55,13 @@ class BaseEnvironment(abc.ABC):
     def _reset(self):
         if getattr(self, '_ep_state', None) is None:
             return
+        self._clear_actuator_handles()
         return self._ep_api.state_manager.reset_state(self._ep_state)
 
     def _exec(self, *args):
+        self._flush_variable_requests()
+        self._actuator_values.clear()
+        self._clear_actuator_handles()
         return self._ep_api.runtime.run_energyplus(
             self._ep_state,
             command_line_args=args
@@ -70,7 +73,21 @@ class BaseEnvironment(abc.ABC):
     def reset(self):
         return self._reset()
 
-    def __call__(self, *args):
+    Episode = utils.models.Episode
+
+    def _episode_args(self, args: typing.Sequence[str], episode: Episode):
+        # TODO NOTE energyplus command line: the model is the last argument
+        if not args or not str(args[-1]).lower().endswith(utils.models._model_suffixes):
+            raise ValueError(
+                f'episode requires the model as the last argument; got {args}'
+            )
+        if not isinstance(episode, self.Episode):
+            episode = self.Episode(*episode)
+        return (*args[:-1], str(utils.models.episode_model(args[-1], episode)))
+
+    def __call__(self, *args, episode: Episode = None):
+        if episode is not None:
+            args = self._episode_args(args, episode)
         return self._exec(*args)
 
     def stop(self):
@@ -151,67 +168,65 @@ class BaseEnvironment(abc.ABC):
             events=pd.DataFrame(self.Event._get_ep_available_specs())
         )
 
-    class Component(abc.ABC):
-        class NotReadyError(NotReadyError):
-            pass
-
-        class Specs(typing.NamedTuple):
-            ...
-
-        def __init__(
-            self,
-            specs: Specs | typing.Mapping,
-            environment: 'BaseEnvironment'
-        ):
-            self._specs = (
-                specs
-                if isinstance(specs, self.Specs)
-                else
-                self.Specs(**specs)
-            )
-            self._env = environment
-
-        @property
-        def specs(self):
-            return self._specs
-
-        @property
-        def name(self):
-            return str.join(' | ', self.specs)
+    Component = components.Component
 
     class DataComponent(Component):
+        __slots__ = ()
+
         @property
         def value(self):
             ...
 
-    def _component(
-        self,
-        specs: typing.Mapping | Component.Specs | pd.DataFrame,
-        constructor: typing.Callable[[Component.Specs], Component]
-    ):
-        if isinstance(specs, pd.DataFrame):
-            return pd.DataFrame.apply(specs, constructor, axis='columns')
-        return constructor(specs)
+    # TODO NOTE variables need to be requested before each run:
+    # requests are collected (deduplicated) and issued in one batch by `_exec`
+    @functools.cached_property
+    def _variable_requests(self) -> utils.containers.OrderedSetDict:
+        return utils.containers.OrderedSetDict()
+
+    def _request_variable(self, specs: Variable.Specs):
+        self._variable_requests.add(specs)
+
+    def _flush_variable_requests(self):
+        request_variable = self._ep_api.exchange.request_variable
+        for specs in self._variable_requests:
+            request_variable(
+                self._ep_state,
+                variable_name=specs.variable_name,
+                variable_key=specs.variable_key
+            )
 
     class Actuator(DataComponent, Component):
+        # NOTE the handle is cached once the data is ready; cleared by `_clear_actuator_handles`
+        __slots__ = ('_handle', )
+
         class Specs(typing.NamedTuple):
             component_type: str
             control_type: str
             actuator_key: str
 
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._handle = None
+
         @property
         def _ep_handle(self):
-            if not self._env._data_ready:
-                raise self.NotReadyError()
-            return self._env._ep_api.exchange.get_actuator_handle(
-                self._env._ep_state,
-                component_type=self._specs.component_type,
-                control_type=self._specs.control_type,
-                actuator_key=self._specs.actuator_key
-            )
+            handle = self._handle
+            if handle is None:
+                if not self._env._data_ready:
+                    raise self.NotReadyError()
+                handle = self._handle = self._env._ep_api.exchange.get_actuator_handle(
+                    self._env._ep_state,
+                    component_type=self._specs.component_type,
+                    control_type=self._specs.control_type,
+                    actuator_key=self._specs.actuator_key
+                )
+            return handle
 
         @property
         def value(self):
+            pending = self._env._actuator_pending
+            if pending is not None and self in pending:
+                return pending[self]
             return self._env._ep_api.exchange.get_actuator_value(
                 self._env._ep_state,
                 actuator_handle=self._ep_handle
@@ -219,28 +234,74 @@ class BaseEnvironment(abc.ABC):
 
         @value.setter
         def value(self, n: float):
-            self._env._ep_api.exchange.set_actuator_value(
-                self._env._ep_state,
-                actuator_handle=self._ep_handle,
-                actuator_value=n
-            )
+            # NOTE raises `NotReadyError` here rather than when flushed
+            if self._handle is None:
+                self._ep_handle
+            self._env._write_actuators({self: n})
 
         def reset(self):
-            self._env._ep_api.exchange.reset_actuator(
-                self._env._ep_state,
-                actuator_handle=self._ep_handle
-            )
+            self._env.reset_actuators([self])
 
     def actuator(
         self,
         specs: typing.Mapping | Actuator.Specs | pd.DataFrame
     ) -> Actuator:
-        return self._component(
-            specs,
-            lambda d: self.Actuator(d, environment=self)
-        )
+        return self._component(specs, self.Actuator)
+
+    # TODO NOTE actuator writes are coalesced:
+    # - writes within an event dispatch (while `_actuator_pending` is set) are buffered;
+    #   only the last value of each actuator is flushed at the end of the dispatch
+    # - values equal to the last one written (since the start of the run
+    #   or the last reset) are skipped: actuated values persist until reset
+    @functools.cached_property
+    def _actuator_values(self) -> typing.Dict[Actuator, float]:
+        return dict()
+
+    _actuator_pending: typing.Dict[Actuator, float] | None = None
+
+    def _clear_actuator_handles(self):
+        for c in self._components.values():
+            if isinstance(c, self.Actuator):
+                c._handle = None
+
+    def _write_actuators(self, values: typing.Mapping[Actuator, float]):
+        if self._actuator_pending is not None:
+            self._actuator_pending.update(values)
+            return
+
+        set_actuator_value = self._ep_api.exchange.set_actuator_value
+        for actuator, value in values.items():
+            if self._actuator_values.get(actuator) == value:
+                continue
+            set_actuator_value(
+                self._ep_state,
+                actuator_handle=actuator._ep_handle,
+                actuator_value=value
+            )
+            self._actuator_values[actuator] = value
+
+    # TODO NOTE releases the control of the actuators in bulk;
+    # defaults to all the actuators written since the start of the run
+    def reset_actuators(self, actuators: typing.Iterable[Actuator] = None):
+        if actuators is None:
+            actuators = [*self._actuator_values.keys()]
+            if self._actuator_pending is not None:
+                actuators.extend(self._actuator_pending.keys())
+
+        reset_actuator = self._ep_api.exchange.reset_actuator
+        for actuator in dict.fromkeys(actuators):
+            if self._actuator_pending is not None:
+                self._actuator_pending.pop(actuator, None)
+            self._actuator_values.pop(actuator, None)
+            reset_actuator(
+                self._ep_state,
+                actuator_handle=actuator._ep_handle
+            )
+        return self
 
     class InternalVariable(DataComponent, Component):
+        __slots__ = ()
+
         class Specs(typing.NamedTuple):
             variable_type: str
             variable_key: str
@@ -266,12 +327,11 @@ class BaseEnvironment(abc.ABC):
         self,
         specs: typing.Mapping | InternalVariable.Specs | pd.DataFrame
     ) -> InternalVariable:
-        return self._component(
-            specs,
-            lambda d: self.InternalVariable(d, environment=self)
-        )
+        return self._component(specs, self.InternalVariable)
 
     class Meter(DataComponent, Component):
+        __slots__ = ()
+
         class Specs(typing.NamedTuple):
             meter_name: str
 
@@ -295,12 +355,11 @@ class BaseEnvironment(abc.ABC):
         self,
         specs: typing.Mapping | Meter.Specs | pd.DataFrame
     ) -> Meter:
-        return self._component(
-            specs,
-            lambda d: self.Meter(d, environment=self)
-        )
+        return self._component(specs, self.Meter)
 
     class Variable(DataComponent, Component):
+        __slots__ = ()
+
         class Specs(typing.NamedTuple):
             variable_name: str
             variable_key: str
@@ -314,11 +373,7 @@ class BaseEnvironment(abc.ABC):
             self._make_avilable()
 
         def _make_avilable(self):
-            self._env._ep_api.exchange.request_variable(
-                self._env._ep_state,
-                variable_name=self._specs.variable_name,
-                variable_key=self._specs.variable_key
-            )
+            self._env._request_variable(self._specs)
 
         @property
         def _ep_handle(self):
@@ -341,12 +396,11 @@ class BaseEnvironment(abc.ABC):
         self,
         specs: typing.Mapping | Variable.Specs | pd.DataFrame
     ) -> Variable:
-        return self._component(
-            specs,
-            lambda d: self.Variable(d, environment=self)
-        )
+        return self._component(specs, self.Variable)
 
     class Event(Component):
+        __slots__ = ()
+
         Callback = typing.Callable
         StateCallback = Callback[[], typing.Any]
         MessageCallback = Callback[[str], typing.Any]
@@ -481,10 +535,7 @@ class BaseEnvironment(abc.ABC):
         self,
         specs: typing.Mapping | Event.Specs | pd.DataFrame
     ) -> Event:
-        return self._component(
-            specs,
-            lambda d: self.Event(d, environment=self)
-        )
+        return self._component(specs, self.Event)
 
     @property
     def datetime(self):
@@ -512,84 +563,59 @@ class Environment(BaseEnvironment):
 
         return super().__init__(ep_api)
 
-    def __call__(self, *args, verbose: bool = False):
+    # TODO NOTE total time (in seconds) spent in callbacks
+    callback_time: float = 0.
+
+    def __call__(
+        self,
+        *args,
+        verbose: bool = False,
+        episode: BaseEnvironment.Episode = None
+    ):
         self._console_output(enabled=verbose)
-        return super().__call__(*args)
+        return super().__call__(*args, episode=episode)
 
     class Event(BaseEnvironment.Event):
+        __slots__ = ()
+
         @property
         def callback(self):
             return super().callback
 
         @callback.setter
         def callback(self, f):
+            env = self._env
+            perf_counter = time.perf_counter
+
+            # TODO NOTE runs with the GIL held (e.g. on the thread of the state):
+            # buffers the actuator writes of the (outermost) dispatch inline
+            # to keep it short
             def _safe_callback(*args, **kwargs):
-                nonlocal self, f
+                t_start = perf_counter()
+                outermost = env._actuator_pending is None
+                if outermost:
+                    env._actuator_pending = dict()
                 try:
                     return f(*args, **kwargs)
                 except Exception as e:
-                    self._env.stop()
+                    # NOTE the writes of a failed callback are discarded
+                    if outermost:
+                        env._actuator_pending = None
+                    env.stop()
                     raise e
+                finally:
+                    if outermost:
+                        pending, env._actuator_pending = env._actuator_pending, None
+                        if pending:
+                            env._write_actuators(pending)
+                    env.callback_time += perf_counter() - t_start
 
             return super(type(self), type(self)).callback.fset(
                 self,
                 _safe_callback
             )
 
-    class EventListener:
-        @dataclasses.dataclass
-        class Data:
-            class CallableSet(utils.containers.CallableSet):
-                # TODO NOTE return the last value instead of all the values
-                # in case the energyplus api requires it
-                def __call__(self, *args, **kwargs):
-                    _last = lambda x: next(reversed(x))
-                    return _last(
-                        super().__call__(*args, **kwargs)
-                            .values()
-                    )
-
-            callbacks: CallableSet \
-                = dataclasses.field(default_factory=CallableSet)
-
-        def __init__(self, env: BaseEnvironment):
-            self._env = env
-            self._event_data: typing.Mapping[Environment.Event.Specs, self.Data] \
-                = collections.defaultdict(self.Data)
-
-        def subscribe(
-            self,
-            event_specs: BaseEnvironment.Event.Specs,
-            *callbacks: typing.Callable
-        ):
-            if not isinstance(event_specs, self._env.Event.Specs):
-                event_specs = self._env.Event.Specs(**event_specs)
-
-            c = self._event_data[event_specs].callbacks
-            for callback in callbacks:
-                c.add(callback)
-            self._env.event(event_specs).callback = c
-
-            return self
-
-        def unsubscribe(
-            self,
-            event_specs: BaseEnvironment.Event.Specs,
-            *callbacks: typing.Callable
-        ):
-            if not isinstance(event_specs, self._env.Event.Specs):
-                event_specs = self._env.Event.Specs(**event_specs)
-
-            for callback in callbacks:
-                self._event_data[event_specs].callbacks.remove(callback)
-
-            return self
-
-        def sync(self):
-            for event_specs, callback in self._event_data.items():
-                self._env.event(event_specs).callback = callback
-
-            return self
+    EventListener = components.EventListener
 
     @functools.cached_property
     def event_listener(self):
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import abc
+import copy
+import typing
+
+import numpy as np
+
+
+# TODO NOTE stages update in O(1) per step (per channel) and allocate their state
+# on the first update from the shape of the values: (channels,) or, with batched
+# environments (e.g. `ooep.surrogate`), (channels, instances)
+
+class Stage(abc.ABC):
+    """
+    Incremental transform of a stream of values.
+    """
+
+    _state_names: typing.Tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def _init(self, x: np.ndarray):
+        ...
+
+    @abc.abstractmethod
+    def _update(self, x: np.ndarray) -> np.ndarray:
+        ...
+
+    def update(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        if getattr(self, '_initialized', False) is False:
+            self._init(x)
+            self._initialized = True
+        return self._update(x)
+
+    def reset(self):
+        self._initialized = False
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        if not getattr(self, '_initialized', False):
+            return dict()
+        return {
+            name: copy.copy(getattr(self, name))
+                for name in self._state_names
+        }
+
+    def restore(self, snapshot: typing.Mapping[str, typing.Any]):
+        if not snapshot:
+            return self.reset()
+        for name in self._state_names:
+            setattr(self, name, copy.copy(snapshot[name]))
+        self._initialized = True
+
+class Chain(Stage):
+    """
+    Stages applied in sequence.
+    """
+
+    def __init__(self, *stages: Stage):
+        self.stages = stages
+
+    def _init(self, x):
+        pass
+
+    def _update(self, x):
+        for stage in self.stages:
+            x = stage.update(x)
+        return x
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def snapshot(self):
+        return dict(stages=[stage.snapshot() for stage in self.stages])
+
+    def restore(self, snapshot):
+        for stage, s in zip(self.stages, snapshot.get('stages', ())):
+            stage.restore(s)
+
+class Delta(Stage):
+    """
+    Difference from the previous values, e.g. per-timestep consumption from
+    cumulative meters; `initial` on the first update.
+    """
+
+    _state_names = ('_prev',)
+
+    def __init__(self, initial: float = 0.):
+        self.initial = initial
+
+    def _init(self, x):
+        self._prev = None
+
+    def _update(self, x):
+        res = (
+            np.full_like(x, self.initial) if self._prev is None else
+            x - self._prev
+        )
+        self._prev = x.copy()
+        return res
+
+class RollingMean(Stage):
+    """
+    Mean over the last `window` updates (fewer until the window fills):
+    a ring buffer and a running sum.
+    """
+
+    _state_names = ('_buf', '_sum', '_i', '_n')
+
+    def __init__(self, window: int):
+        self.window = window
+
+    def _init(self, x):
+        self._buf = np.zeros((self.window, *x.shape))
+        self._sum = np.zeros(x.shape)
+        self._i = 0
+        self._n = 0
+
+    def _update(self, x):
+        self._sum += x - self._buf[self._i]
+        self._buf[self._i] = x
+        self._i = (self._i + 1) % self.window
+        self._n = min(self._n + 1, self.window)
+        if self._i == 0:
+            # NOTE resum once per window (amortized O(1)) against the drift
+            self._sum[...] = self._buf.sum(axis=0)
+        return self._sum / self._n
+
+class EWMA(Stage):
+    """
+    Exponentially weighted moving average: of smoothing factor `alpha`,
+    or with the weights halved every `halflife` updates.
+    """
+
+    _state_names = ('_mean',)
+
+    def __init__(self, alpha: float = None, halflife: float = None):
+        if (alpha is None) == (halflife is None):
+            raise ValueError('exactly one of `alpha` and `halflife` required')
+        self.alpha = alpha if alpha is not None else 1 - .5 ** (1 / halflife)
+
+    def _init(self, x):
+        self._mean = None
+
+    def _update(self, x):
+        if self._mean is None:
+            self._mean = x.copy()
+        else:
+            self._mean += self.alpha * (x - self._mean)
+        return self._mean.copy()
+
+class RunningNorm(Stage):
+    """
+    Standardize by the running mean and variance (Welford's algorithm).
+
+    Parameters
+    ----------
+    eps : float
+        Added to the variance.
+    frozen : bool
+        Whether to stop updating the statistics (e.g. for evaluation).
+    """
+
+    _state_names = ('_count', '_mean', '_m2')
+
+    def __init__(self, eps: float = 1e-8, frozen: bool = False):
+        self.eps = eps
+        self.frozen = frozen
+
+    def _init(self, x):
+        self._count = 0
+        self._mean = np.zeros(x.shape)
+        self._m2 = np.zeros(x.shape)
+
+    def _update(self, x):
+        if not self.frozen:
+            self._count += 1
+            d = x - self._mean
+            self._mean += d / self._count
+            self._m2 += d * (x - self._mean)
+        return (x - self._mean) / np.sqrt(self.var + self.eps)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._mean
+
+    @property
+    def var(self) -> np.ndarray:
+        return self._m2 / max(self._count, 1)
+
+class Pipeline:
+    """
+    Features of EMS components, updated on each dispatch of `event_specs`.
+
+    Each distinct component is read once per update; each feature is a
+    `Stage` over a subset of the components (its channels).
+
+    Examples
+    --------
+    >>> features = Pipeline(env)
+    >>> features.add('t_1h', tzones, RollingMean(window=6))
+    >>> features.add('t_24h', tzones, RollingMean(window=6 * 24))
+    >>> features.add('power', [emeter], Delta(), RunningNorm())
+    >>> env.event_listener.subscribe(..., lambda: policy(features.observation))
+    """
+
+    def __init__(
+        self,
+        env: 'ooep.ems.BaseEnvironment' = None,
+        event_specs: typing.Mapping = dict(
+            event_name='begin_zone_timestep_after_init_heat_balance'
+        ),
+        skip_warmup: bool = True
+    ):
+        self._env = env
+        self._event_specs = event_specs
+        self._skip_warmup = skip_warmup
+
+        self._components: typing.Dict[typing.Any, int] = dict()
+        self._features: typing.Dict[str, typing.Tuple[np.ndarray, Stage]] = dict()
+        self.values: typing.Dict[str, np.ndarray] = dict()
+
+        if self._env is not None:
+            self._env.event_listener.subscribe(self._event_specs, self._on_event)
+
+    def add(
+        self,
+        name: str,
+        components: typing.Sequence['ooep.ems.BaseEnvironment.DataComponent'],
+        *stages: Stage
+    ):
+        index = np.array([
+            self._components.setdefault(c, len(self._components))
+                for c in components
+        ], dtype=np.intp)
+        self._features[name] = (
+            index,
+            stages[0] if len(stages) == 1 else Chain(*stages)
+        )
+        return self
+
+    @property
+    def components(self):
+        return [*self._components]
+
+    def _on_event(self):
+        if self._skip_warmup and self._env.warming_up:
+            return
+        try:
+            values = [c.value for c in self._components]
+        except self._env.Component.NotReadyError:
+            return
+        self.update(values)
+
+    def update(self, values: typing.Sequence[float | np.ndarray]):
+        """
+        Update the features from the values of `components` (in order).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        for name, (index, stage) in self._features.items():
+            self.values[name] = stage.update(values[index])
+        return self.values
+
+    @property
+    def observation(self) -> np.ndarray:
+        """
+        The latest values of the features, concatenated (in order of `add`).
+        """
+        return np.concatenate([
+            self.values[name] for name in self._features
+        ])
+
+    def reset(self):
+        for _, stage in self._features.values():
+            stage.reset()
+        self.values.clear()
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        """
+        The state of the features, e.g. at an episode boundary; see `restore`.
+        """
+        return dict(
+            stages={
+                name: stage.snapshot()
+                    for name, (_, stage) in self._features.items()
+            },
+            values={name: v.copy() for name, v in self.values.items()}
+        )
+
+    def restore(self, snapshot: typing.Mapping[str, typing.Any]):
+        for name, (_, stage) in self._features.items():
+            stage.restore(snapshot['stages'].get(name, dict()))
+        self.values = {name: v.copy() for name, v in snapshot['values'].items()}
+        return self
+
+    def close(self):
+        if self._env is not None:
+            self._env.event_listener.unsubscribe(self._event_specs, self._on_event)
+        return self
+
+__all__ = [
+    Stage,
+    Chain,
+    Delta,
+    RollingMean,
+    EWMA,
+    RunningNorm,
+    Pipeline
+]
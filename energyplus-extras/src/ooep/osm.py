@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import os
+import re
+import typing
+import functools
+import collections
+
+import pandas as pd
+
+
+# TODO NOTE ref https://openstudio-sdk-documentation.s3.amazonaws.com/index.html
+# objects are `OS:<type>, <handle>, <field>, ..., <field>;` one field per line,
+# each followed by a `!- <field name> {<unit>}` comment
+
+class OSM:
+    """
+    Reader of OpenStudio `.osm` models; does not require OpenStudio.
+
+    The file is parsed in one pass into a table of its objects,
+    indexed by type and handle. The zones, loops and links between
+    components, and drafts of the EMS specs the model will expose
+    (once translated to EnergyPlus) are derived from it on demand.
+
+    Examples
+    --------
+    >>> model = OSM('archive/data/openstudio/osproject-college/college-tampa-fl.osm')
+    >>> model.zones
+    >>> model.loops.query('loop_type == "OS:PlantLoop"')
+    >>> env.actuator(model.specs.actuators.query('control_type == "Cooling Setpoint"'))
+    """
+
+    class Object(typing.NamedTuple):
+        type: str
+        # NOTE the handle first
+        fields: typing.Tuple[str, ...]
+
+        @property
+        def handle(self) -> str:
+            return self.fields[0]
+
+        @property
+        def name(self) -> str | None:
+            # NOTE unnamed types (e.g. `OS:Connection`) have handles as their second field
+            if len(self.fields) < 2 or self.fields[1].startswith('{'):
+                return None
+            return self.fields[1]
+
+    class Specs(typing.NamedTuple):
+        actuators: pd.DataFrame
+        variables: pd.DataFrame
+
+    _unit_pattern = re.compile(r'\s*\{.*\}\s*$')
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = path
+        self._objects: typing.List[OSM.Object] = []
+        # {<type>: (<field name>, ...)}
+        self._field_names: typing.Dict[str, typing.Tuple[str, ...]] = dict()
+
+        with open(path, 'r') as f:
+            self._parse(f)
+
+        self._by_handle: typing.Dict[str, int] = {
+            o.handle: i for i, o in enumerate(self._objects)
+        }
+        self._by_type: typing.Dict[str, typing.List[int]] = collections.defaultdict(list)
+        for i, o in enumerate(self._objects):
+            self._by_type[o.type].append(i)
+
+    def _parse(self, lines: typing.Iterable[str]):
+        type_, fields, names = None, [], []
+        for line in lines:
+            value, _, comment = line.partition('!-')
+            value = value.strip()
+            if not value:
+                continue
+            if type_ is None:
+                # NOTE `OS:<type>,`
+                type_ = value.rstrip(',;')
+                continue
+            end = value.endswith(';')
+            fields.append(value[:-1].strip())
+            names.append(self._unit_pattern.sub('', comment.strip()))
+            if end:
+                self._objects.append(self.Object(type_, tuple(fields)))
+                self._field_names.setdefault(type_, tuple(names))
+                type_, fields, names = None, [], []
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __getitem__(self, handle: str) -> Object:
+        return self._objects[self._by_handle[handle]]
+
+    def __contains__(self, handle: str):
+        return handle in self._by_handle
+
+    def get(self, handle: str, default=None) -> Object | None:
+        i = self._by_handle.get(handle)
+        return default if i is None else self._objects[i]
+
+    @property
+    def types(self) -> typing.Collection[str]:
+        return self._by_type.keys()
+
+    def by_type(self, type_: str) -> typing.List[Object]:
+        return [self._objects[i] for i in self._by_type.get(type_, ())]
+
+    def field_names(self, type_: str) -> typing.Tuple[str, ...]:
+        return self._field_names.get(type_, ())
+
+    def field(self, o: Object, name: str, default: str = None) -> str | None:
+        try:
+            value = o.fields[self.field_names(o.type).index(name)]
+        except (ValueError, IndexError):
+            return default
+        return value if value != '' else default
+
+    def port_object(self, o: Object, name: str) -> str | None:
+        """
+        The handle of the object linked to `o` at port field `name`
+        (ports refer to `OS:Connection`s, other fields to objects directly).
+        """
+        h = self.field(o, name)
+        c = self.get(h) if h is not None else None
+        if c is None or c.type != 'OS:Connection':
+            return h
+        source = self.field(c, 'Source Object')
+        return self.field(c, 'Target Object') if source == o.handle else source
+
+    def name_of(self, handle: str) -> str | None:
+        o = self.get(handle)
+        return None if o is None else o.name
+
+    @functools.cached_property
+    def objects(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(o.type, o.handle, o.name) for o in self._objects],
+            columns=['type', 'handle', 'name']
+        )
+
+    def to_frame(self, type_: str) -> pd.DataFrame:
+        """
+        The objects of `type_`, one column per field, indexed by handle.
+        """
+        names = self.field_names(type_)
+        return pd.DataFrame(
+            [o.fields + ('',) * (len(names) - len(o.fields)) for o in self.by_type(type_)],
+            columns=names
+        ).set_index(names[0])
+
+    @functools.cached_property
+    def zones(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [
+                dict(
+                    handle=o.handle,
+                    name=o.name,
+                    thermostat=self.name_of(self.field(o, 'Thermostat Name', '')),
+                    multiplier=int(self.field(o, 'Multiplier', '1'))
+                ) for o in self.by_type('OS:ThermalZone')
+            ],
+            columns=['handle', 'name', 'thermostat', 'multiplier']
+        )
+
+    # TODO NOTE directed graph of the objects through `OS:Connection`s
+    # (<source object> -> <target object>), with port lists linked both ways
+    # to their components (e.g. a zone and its inlet/exhaust/return port lists)
+    @functools.cached_property
+    def _graph(self) -> typing.Tuple[typing.Dict[str, typing.Set[str]], typing.Dict[str, typing.Set[str]]]:
+        succs, preds = collections.defaultdict(set), collections.defaultdict(set)
+
+        def _link(a, b):
+            succs[a].add(b)
+            preds[b].add(a)
+
+        for o in self.by_type('OS:Connection'):
+            source = self.field(o, 'Source Object')
+            target = self.field(o, 'Target Object')
+            if source is None or target is None:
+                continue
+            _link(source, target)
+        for o in self.by_type('OS:PortList'):
+            component = self.field(o, 'HVAC Component')
+            if component is None:
+                continue
+            _link(o.handle, component)
+            _link(component, o.handle)
+        return succs, preds
+
+    @functools.cached_property
+    def links(self) -> pd.DataFrame:
+        """
+        Links between components through nodes:
+        `source` -> (`node`) -> `target`; node and port list objects are contracted.
+        """
+        succs, preds = self._graph
+        _contracted = ('OS:Node', 'OS:PortList')
+
+        def _ends(handle, adjacency, seen):
+            # NOTE the first components through nodes and port lists
+            for h in adjacency.get(handle, ()):
+                if h in seen:
+                    continue
+                seen.add(h)
+                o = self.get(h)
+                if o is None:
+                    continue
+                if o.type in _contracted:
+                    yield from _ends(h, adjacency, seen)
+                else:
+                    yield o
+
+        rows = []
+        for node in self.by_type('OS:Node'):
+            for source in _ends(node.handle, preds, {node.handle}):
+                for target in _ends(node.handle, succs, {node.handle}):
+                    if source.handle == target.handle:
+                        continue
+                    rows.append((
+                        node.name,
+                        source.type, source.name, source.handle,
+                        target.type, target.name, target.handle
+                    ))
+        return pd.DataFrame(rows, columns=[
+            'node',
+            'source_type', 'source_name', 'source_handle',
+            'target_type', 'target_name', 'target_handle'
+        ]).drop_duplicates(ignore_index=True)
+
+    _loop_sides = {
+        'OS:AirLoopHVAC': (
+            ('supply', 'Supply Side Inlet Node Name', 'Supply Side Outlet Node A'),
+            ('demand', 'Demand Side Inlet Node A', 'Demand Side Outlet Node Name')
+        ),
+        'OS:PlantLoop': (
+            ('supply', 'Plant Side Inlet Node Name', 'Plant Side Outlet Node Name'),
+            ('demand', 'Demand Side Inlet Node Name', 'Demand Side Outlet Node Name')
+        )
+    }
+
+    @functools.cached_property
+    def loops(self) -> pd.DataFrame:
+        """
+        Components of the sides of the air and plant loops: those on a path
+        from the inlet to the outlet node of a side (not crossing the sides of other loops).
+        """
+        succs, preds = self._graph
+
+        sides = []
+        for loop_type, side_fields in self._loop_sides.items():
+            for loop in self.by_type(loop_type):
+                for side, inlet_field, outlet_field in side_fields:
+                    inlet = self.port_object(loop, inlet_field)
+                    outlet = self.port_object(loop, outlet_field)
+                    if inlet is None or outlet is None:
+                        continue
+                    sides.append((loop, side, inlet, outlet))
+        # NOTE the loops themselves link their supply outlets to their demand inlets
+        boundaries = {
+            h for loop, _, inlet, outlet in sides
+                for h in (loop.handle, inlet, outlet)
+        }
+
+        def _reach(start, adjacency, stops):
+            seen, stack = {start}, [start]
+            while stack:
+                h = stack.pop()
+                if h in stops and h != start:
+                    continue
+                for n in adjacency.get(h, ()):
+                    if n not in seen:
+                        seen.add(n)
+                        stack.append(n)
+            return seen
+
+        rows = []
+        for loop, side, inlet, outlet in sides:
+            stops = boundaries - {inlet, outlet}
+            members = _reach(inlet, succs, stops | {outlet}) & _reach(outlet, preds, stops | {inlet})
+            for h in members:
+                o = self.get(h)
+                if o is None or o.type in ('OS:Node', 'OS:PortList'):
+                    continue
+                rows.append((loop.type, loop.name, side, o.type, o.name, o.handle))
+        return pd.DataFrame(rows, columns=[
+            'loop_type', 'loop_name', 'side',
+            'component_type', 'component_name', 'component_handle'
+        ]).sort_values(['loop_type', 'loop_name', 'side', 'component_type', 'component_name'], ignore_index=True)
+
+    @property
+    def air_loops(self) -> pd.DataFrame:
+        return self.loops[self.loops['loop_type'] == 'OS:AirLoopHVAC'].reset_index(drop=True)
+
+    @property
+    def plant_components(self) -> pd.DataFrame:
+        return self.loops[self.loops['loop_type'] == 'OS:PlantLoop'].reset_index(drop=True)
+
+    # TODO NOTE EnergyPlus object types are the OpenStudio ones without `OS:` (for most)
+    @staticmethod
+    def _ep_type(type_: str) -> str:
+        return type_[len('OS:'):] if type_.startswith('OS:') else type_
+
+    # {<openstudio type>: ((<component type or None for the energyplus type>, <control type>), ...)}
+    _actuator_types = {
+        'OS:Fan:VariableVolume': ((None, 'Fan Air Mass Flow Rate'), (None, 'Fan Pressure Rise'), (None, 'Fan Total Efficiency')),
+        'OS:Fan:ConstantVolume': ((None, 'Fan Air Mass Flow Rate'), (None, 'Fan Pressure Rise'), (None, 'Fan Total Efficiency')),
+        'OS:Fan:OnOff': ((None, 'Fan Air Mass Flow Rate'), (None, 'Fan Pressure Rise'), (None, 'Fan Total Efficiency')),
+        'OS:Controller:OutdoorAir': (('Outdoor Air Controller', 'Air Mass Flow Rate'), ),
+        'OS:People': (('People', 'Number of People'), ),
+        'OS:Lights': (('Lights', 'Electricity Rate'), ),
+        'OS:ElectricEquipment': (('ElectricEquipment', 'Electricity Rate'), ),
+        'OS:Schedule:Ruleset': (('Schedule:Year', 'Schedule Value'), ),
+        'OS:Schedule:Constant': (('Schedule:Constant', 'Schedule Value'), ),
+        'OS:Schedule:Compact': (('Schedule:Compact', 'Schedule Value'), )
+    }
+    # {<openstudio type>: (<variable name>, ...)}
+    _variable_types = {
+        'OS:ThermalZone': (
+            'Zone Mean Air Temperature', 'Zone Air Relative Humidity',
+            'Zone Thermostat Heating Setpoint Temperature',
+            'Zone Thermostat Cooling Setpoint Temperature'
+        ),
+        'OS:Node': ('System Node Temperature', 'System Node Mass Flow Rate'),
+        'OS:Fan:VariableVolume': ('Fan Electricity Rate', ),
+        'OS:Fan:ConstantVolume': ('Fan Electricity Rate', ),
+        'OS:Fan:OnOff': ('Fan Electricity Rate', ),
+        'OS:Pump:VariableSpeed': ('Pump Electricity Rate', ),
+        'OS:Pump:ConstantSpeed': ('Pump Electricity Rate', ),
+        'OS:Chiller:Electric:EIR': ('Chiller Electricity Rate', 'Chiller Evaporator Cooling Rate'),
+        'OS:Boiler:HotWater': ('Boiler Heating Rate', ),
+        'OS:CoolingTower:VariableSpeed': ('Cooling Tower Fan Electricity Rate', ),
+        'OS:CoolingTower:SingleSpeed': ('Cooling Tower Fan Electricity Rate', ),
+        'OS:Coil:Cooling:Water': ('Cooling Coil Total Cooling Rate', ),
+        'OS:Coil:Heating:Water': ('Heating Coil Heating Rate', ),
+        'OS:WaterHeater:Mixed': ('Water Heater Heating Rate', )
+    }
+    _site_variables = (
+        'Site Outdoor Air Drybulb Temperature',
+        'Site Outdoor Air Wetbulb Temperature',
+        'Site Outdoor Air Relative Humidity',
+        'Site Direct Solar Radiation Rate per Area',
+        'Site Diffuse Solar Radiation Rate per Area'
+    )
+    _weather_actuators = (
+        'Outdoor Dry Bulb', 'Outdoor Dew Point', 'Outdoor Relative Humidity',
+        'Wind Speed', 'Wind Direction'
+    )
+
+    @functools.cached_property
+    def specs(self) -> Specs:
+        """
+        Draft of the EMS specs of the model (columns of
+        `ooep.ems.BaseEnvironment.Actuator.Specs` and `.Variable.Specs`):
+        the common actuators and variables of its objects, and those of
+        its EMS objects. Check against `Environment.specs` once run.
+        """
+        actuators, variables = [], []
+
+        # zones
+        for zone in self.by_type('OS:ThermalZone'):
+            if self.field(zone, 'Thermostat Name') is not None:
+                actuators.append(('Zone Temperature Control', 'Heating Setpoint', zone.name))
+                actuators.append(('Zone Temperature Control', 'Cooling Setpoint', zone.name))
+        # components
+        for type_, controls in self._actuator_types.items():
+            for o in self.by_type(type_):
+                for component_type, control_type in controls:
+                    actuators.append((component_type or self._ep_type(type_), control_type, o.name))
+        # nodes: those of the setpoint managers and the plant loops
+        setpoint_nodes = {
+            h for t in self.types if t.startswith('OS:SetpointManager')
+                for o in self.by_type(t)
+                    for name, h in zip(self.field_names(t), o.fields)
+                        if name.startswith('Setpoint Node') and h
+        } | {
+            self.port_object(o, 'Loop Temperature Setpoint Node Name')
+                for o in self.by_type('OS:PlantLoop')
+        }
+        for h in setpoint_nodes:
+            name = self.name_of(h)
+            if name is not None:
+                actuators.append(('System Node Setpoint', 'Temperature Setpoint', name))
+        # plant
+        for loop in self.by_type('OS:PlantLoop'):
+            actuators.append(('Plant Loop Overall', 'On/Off Supervisory', loop.name))
+        for row in self.plant_components.drop_duplicates('component_handle').itertuples():
+            if row.component_type.startswith(('OS:Connector', 'OS:Pipe')):
+                continue
+            actuators.append((
+                f'Plant Component {self._ep_type(row.component_type)}',
+                'On/Off Supervisory',
+                row.component_name
+            ))
+        # weather
+        for control_type in self._weather_actuators:
+            actuators.append(('Weather Data', control_type, 'Environment'))
+        # ems
+        for o in self.by_type('OS:EnergyManagementSystem:Actuator'):
+            actuators.append((
+                self.field(o, 'Actuated Component Type'),
+                self.field(o, 'Actuated Component Control Type'),
+                self.name_of(self.field(o, 'Actuated Component Name', ''))
+                    or self.field(o, 'Actuated Component Name')
+            ))
+
+        for type_, names in self._variable_types.items():
+            for o in self.by_type(type_):
+                for name in names:
+                    variables.append((name, o.name))
+        for name in self._site_variables:
+            variables.append((name, 'Environment'))
+        for o in self.by_type('OS:EnergyManagementSystem:Sensor'):
+            variables.append((
+                self.field(o, 'Output Variable or Output Meter Name'),
+                self.field(o, 'Output Variable or Output Meter Index Key Name')
+            ))
+
+        return self.Specs(
+            actuators=pd.DataFrame(
+                actuators, columns=['component_type', 'control_type', 'actuator_key']
+            ).dropna().drop_duplicates(ignore_index=True),
+            variables=pd.DataFrame(
+                variables, columns=['variable_name', 'variable_key']
+            ).dropna().drop_duplicates(ignore_index=True)
+        )
+
+__all__ = [
+    OSM
+]
@@ -0,0 +1,495 @@
+from __future__ import annotations
+
+import abc
+import typing
+import os
+import re
+import csv
+import calendar
+import pathlib
+import sqlite3
+import concurrent.futures
+
+import numpy as np
+import pandas as pd
+
+
+class Results(abc.ABC):
+    """
+    Reader of the outputs in the `--output-directory` of a run.
+
+    `index` lists the report variables (and meters) available;
+    `load` reads only the requested ones, as a `pandas.DataFrame`
+    indexed by (`environment`, `timestamp`) with a column per variable
+    labeled by its specs (`variable_name`, `variable_key`).
+
+    Examples
+    --------
+    >>> res = Results.open('build/demo-eplus')
+    >>> res.index[res.index['variable_key'] == 'CORE_MID']
+    >>> res.load([('People Air Temperature', 'CORE_MID')])
+    """
+
+    # TODO NOTE fields named after `ooep.ems.BaseEnvironment.Variable.Specs`;
+    # meters have an empty `variable_key`
+    class Specs(typing.NamedTuple):
+        variable_name: str
+        variable_key: str
+
+    index_columns = ('variable_name', 'variable_key', 'units', 'frequency', 'is_meter')
+    # TODO NOTE a non-leap year for the outputs not reporting one
+    default_year = 2001
+
+    @classmethod
+    def open(cls, directory: str | os.PathLike, **kwargs) -> 'Results':
+        """
+        Open the outputs of a run by the best format available:
+        `eplusout.sql`, then `eplusout.csv`, then `eplusout.eso`.
+        """
+        directory = pathlib.Path(directory)
+        for impl in (SQLiteResults, CSVResults, ESOResults):
+            path = directory / impl.filename
+            if path.exists():
+                return impl(path, **kwargs)
+        raise FileNotFoundError(f'no outputs found in {directory}')
+
+    def __init__(self, path: str | os.PathLike, year: int = None):
+        self.path = pathlib.Path(path)
+        self.year = year
+
+    @property
+    @abc.abstractmethod
+    def index(self) -> pd.DataFrame:
+        ...
+
+    @abc.abstractmethod
+    def _load(self, index: pd.DataFrame) -> pd.DataFrame:
+        ...
+
+    def _select(
+        self,
+        specs: pd.DataFrame | typing.Iterable[Specs | typing.Mapping | tuple],
+        frequency: str = None
+    ) -> pd.DataFrame:
+        if isinstance(specs, pd.DataFrame):
+            specs = specs[[*self.Specs._fields]]
+        else:
+            specs = pd.DataFrame(
+                [
+                    s if isinstance(s, tuple) else self.Specs(**s)
+                        for s in specs
+                ],
+                columns=self.Specs._fields
+            )
+        index = self.index.reset_index().merge(specs, on=[*self.Specs._fields])
+        if frequency is not None:
+            index = index[index['frequency'] == frequency]
+        return index.set_index(index.columns[0])
+
+    def load(
+        self,
+        specs: pd.DataFrame | typing.Iterable[Specs | typing.Mapping | tuple],
+        frequency: str = None,
+        environment: str = None
+    ) -> pd.DataFrame:
+        """
+        Load the requested variables.
+
+        Parameters
+        ----------
+        specs : DataFrame or Iterable
+            The (`variable_name`, `variable_key`) pairs to load, e.g.
+            a selection of `index`, or of `ooep.ems.Environment.specs.variables`.
+        frequency : str, optional
+            Only load the variables reported at this frequency
+            (e.g. `'Hourly'`); all of them otherwise.
+        environment : str, optional
+            Only keep the rows of this environment (e.g. `'RUN PERIOD 1'`).
+        """
+        index = self._select(specs, frequency=frequency)
+        df = self._load(index)
+        df.columns = pd.MultiIndex.from_frame(
+            index.loc[df.columns, [*self.Specs._fields]]
+        )
+        if environment is not None:
+            df = df.xs(environment, level='environment', drop_level=False)
+        return df.sort_index()
+
+    def _timestamps(self, month, day, hour, minute, year=None) -> pd.DatetimeIndex:
+        # NOTE energyplus reports the end of each interval, e.g. hour 24 of 12/31
+        if year is None or self.year is not None:
+            year = np.full(
+                len(month),
+                self.year if self.year is not None else self.default_year
+            )
+        else:
+            year = np.where(np.asarray(year) > 0, year, self.default_year)
+        return pd.DatetimeIndex(
+            pd.to_datetime(
+                pd.DataFrame(dict(year=year, month=month, day=day)),
+                errors='coerce'
+            )
+            + pd.to_timedelta(np.asarray(hour, dtype=np.float64), unit='h')
+            + pd.to_timedelta(np.asarray(minute, dtype=np.float64), unit='min'),
+            name='timestamp'
+        )
+
+class SQLiteResults(Results):
+    filename = 'eplusout.sql'
+
+    def _connect(self):
+        return sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+
+    @property
+    def index(self) -> pd.DataFrame:
+        if getattr(self, '_index', None) is None:
+            with self._connect() as conn:
+                df = pd.read_sql_query(
+                    '''
+                    SELECT
+                        ReportDataDictionaryIndex AS id,
+                        Name AS variable_name,
+                        COALESCE(KeyValue, '') AS variable_key,
+                        Units AS units,
+                        ReportingFrequency AS frequency,
+                        IsMeter AS is_meter
+                    FROM ReportDataDictionary
+                    ''',
+                    conn,
+                    index_col='id'
+                )
+            df['is_meter'] = df['is_meter'].astype(bool)
+            self._index = df
+        return self._index
+
+    def _load(self, index: pd.DataFrame) -> pd.DataFrame:
+        ids = [int(i) for i in index.index]
+        with self._connect() as conn:
+            time_columns = {
+                row[1] for row in conn.execute('PRAGMA table_info(Time)')
+            }
+            df = pd.read_sql_query(
+                f'''
+                SELECT
+                    r.ReportDataDictionaryIndex AS id,
+                    r.Value AS value,
+                    t.TimeIndex AS time_index,
+                    {'t.Year' if 'Year' in time_columns else 'NULL'} AS year,
+                    t.Month AS month, t.Day AS day,
+                    t.Hour AS hour, t.Minute AS minute,
+                    e.EnvironmentName AS environment
+                FROM ReportData r
+                JOIN Time t ON r.TimeIndex = t.TimeIndex
+                LEFT JOIN EnvironmentPeriods e
+                    ON t.EnvironmentPeriodIndex = e.EnvironmentPeriodIndex
+                WHERE
+                    r.ReportDataDictionaryIndex IN ({', '.join('?' * len(ids))})
+                    AND (t.WarmupFlag IS NULL OR t.WarmupFlag = 0)
+                ''',
+                conn,
+                params=ids
+            )
+
+        times = df.drop_duplicates('time_index')
+        times = pd.DataFrame(
+            dict(
+                environment=times['environment'].to_numpy(),
+                timestamp=self._timestamps(
+                    times['month'], times['day'],
+                    times['hour'], times['minute'],
+                    year=(
+                        None if times['year'].isna().all() else
+                        times['year'].fillna(0)
+                    )
+                )
+            ),
+            index=times['time_index'].to_numpy()
+        )
+        df = df.pivot(index='time_index', columns='id', values='value')
+        df.index = pd.MultiIndex.from_frame(times.loc[df.index])
+        return df
+
+class CSVResults(Results):
+    filename = 'eplusout.csv'
+    # NOTE meters are also reported on their own in `eplusmtr.csv`
+    meter_filename = 'eplusmtr.csv'
+
+    # TODO NOTE resource and end-use types leading meter names (`<type>:...`),
+    # for outputs without `eplusmtr.csv`; custom meters are not recognized
+    _meter_types = frozenset((
+        'Electricity', 'ElectricityPurchased', 'ElectricityProduced',
+        'ElectricitySurplusSold', 'ElectricityNet', 'NaturalGas', 'Gas',
+        'Gasoline', 'Diesel', 'Coal', 'FuelOilNo1', 'FuelOilNo2', 'Propane',
+        'OtherFuel1', 'OtherFuel2', 'Water', 'MainsWater', 'RainWater',
+        'WellWater', 'Condensate', 'Steam', 'DistrictCooling', 'DistrictHeating',
+        'DistrictHeatingWater', 'DistrictHeatingSteam', 'EnergyTransfer',
+        'Carbon Equivalent', 'InteriorLights', 'ExteriorLights',
+        'InteriorEquipment', 'ExteriorEquipment', 'Fans', 'Pumps', 'Heating',
+        'Cooling', 'HeatRejection', 'Humidifier', 'HeatRecovery', 'WaterSystems',
+        'Refrigeration', 'Cogeneration', 'HeatingCoils', 'CoolingCoils',
+        'Baseboard', 'Chillers', 'Boilers', 'Photovoltaic', 'WindTurbine',
+        'ElectricStorage', 'General'
+    ))
+
+    _header_pattern = re.compile(
+        r'^(?:(?P<variable_key>[^:]*):)?(?P<variable_name>.*?)'
+        r'(?: \[(?P<units>.*?)\])?(?:\((?P<frequency>[^()]*)\))?$'
+    )
+    # NOTE `Date/Time` by frequency: ` MM/DD  HH:MM:SS` (timestep, hourly),
+    # ` MM/DD` (daily), `<month name>` (monthly); anything else (run period)
+    _datetime_pattern = re.compile(
+        r'^\s*(?:(?P<month>\d+)/(?P<day>\d+)'
+        r'(?:\s+(?P<hour>\d+):(?P<minute>\d+):(?P<second>\d+))?'
+        r'|(?P<month_name>[A-Za-z]+))\s*$'
+    )
+    _month_numbers = {
+        name.lower(): i for i, name in enumerate(calendar.month_name) if name
+    }
+
+    @property
+    def index(self) -> pd.DataFrame:
+        if getattr(self, '_index', None) is None:
+            with open(self.path, 'r', newline='') as f:
+                header = next(csv.reader(f))
+            meters = None
+            meter_path = self.path.with_name(self.meter_filename)
+            if meter_path.exists():
+                with open(meter_path, 'r', newline='') as f:
+                    meters = {column.strip() for column in next(csv.reader(f))[1:]}
+            rows = []
+            # NOTE column 0 is `Date/Time`
+            for i, column in enumerate(header[1:], start=1):
+                column = column.strip()
+                m = self._header_pattern.match(column)
+                # NOTE meters have no key: `<name> [<units>](<frequency>)`
+                is_meter = (
+                    column in meters if meters is not None else
+                    m['variable_key'] in self._meter_types
+                )
+                rows.append(dict(
+                    id=i,
+                    variable_name=(
+                        m['variable_name'] if not is_meter else
+                        f'{m["variable_key"]}:{m["variable_name"]}'
+                            if m['variable_key'] is not None else
+                        m['variable_name']
+                    ),
+                    variable_key='' if is_meter else m['variable_key'] or '',
+                    units=m['units'],
+                    frequency=m['frequency'],
+                    is_meter=is_meter
+                ))
+            self._index = pd.DataFrame(
+                rows, columns=['id', *self.index_columns]
+            ).set_index('id')
+        return self._index
+
+    def _load(self, index: pd.DataFrame) -> pd.DataFrame:
+        ids = [int(i) for i in index.index]
+        df = pd.read_csv(self.path, usecols=[0, *ids], header=0)
+        df.columns = [0, *ids]
+
+        dt = df[0].fillna('').astype(str).str.extract(self._datetime_pattern)
+        year = self.year if self.year is not None else self.default_year
+        month = dt['month_name'].str.lower().map(self._month_numbers)
+        month_end = pd.DataFrame(dict(
+            month=month,
+            day=month.map(
+                lambda m: calendar.monthrange(year, int(m))[1],
+                na_action='ignore'
+            )
+        ))
+        dated = dt[['month', 'day']].astype(np.float64)
+        # NOTE run period (or otherwise undated) rows: the end of the last day reported
+        # before them (by timestep, hourly or daily rows; by monthly rows only otherwise)
+        month_day = dated.fillna(month_end).fillna(
+            dated.ffill().fillna(month_end.ffill())
+        )
+        if month_day.isna().to_numpy().any():
+            raise ValueError(
+                f'{self.path}: rows without a preceding dated row to date them: '
+                f'{[*df.loc[month_day["month"].isna(), 0]]}'
+            )
+        # NOTE daily, monthly and run period rows: the end of the day
+        hour = dt['hour'].astype(np.float64).fillna(24.)
+        minute = (
+            dt['minute'].astype(np.float64) + dt['second'].astype(np.float64) / 60
+        ).fillna(0.)
+        timestamps = self._timestamps(month_day['month'], month_day['day'], hour, minute)
+        if timestamps.isna().any():
+            raise ValueError(
+                f'{self.path}: invalid dates: {[*df.loc[timestamps.isna(), 0]]}'
+            )
+
+        df = df.drop(columns=0)
+        df.index = pd.MultiIndex.from_arrays(
+            [np.full(len(df), None), timestamps],
+            names=['environment', 'timestamp']
+        )
+        # NOTE rows of other frequencies are empty for each column;
+        # those of the same time stamp (e.g. the end of a day and of a month) are merged
+        return (
+            df.dropna(how='all')
+            .groupby(level=['environment', 'timestamp'], sort=False, dropna=False)
+            .first()
+        )
+
+class ESOResults(Results):
+    filename = 'eplusout.eso'
+
+    _end_of_dictionary = 'End of Data Dictionary'
+    _end_of_data = 'End of Data'
+    _dictionary_pattern = re.compile(
+        r'^(?P<name>.*?)(?: \[(?P<units>.*?)\])?\s*$'
+    )
+
+    @property
+    def index(self) -> pd.DataFrame:
+        if getattr(self, '_index', None) is None:
+            rows = []
+            with open(self.path, 'r') as f:
+                # NOTE program version line
+                next(f)
+                for line in f:
+                    line = line.rstrip('\n')
+                    if line.startswith(self._end_of_dictionary):
+                        break
+                    # <code>,<n_values>,[<key>,]<name> [<units>] !<frequency> [...]
+                    line, _, comment = line.partition('!')
+                    code, _n, *fields = line.split(',')
+                    # NOTE reserved codes: environment and time stamps
+                    if int(code) <= 5:
+                        continue
+                    m = self._dictionary_pattern.match(fields[-1])
+                    rows.append(dict(
+                        id=int(code),
+                        variable_name=m['name'],
+                        variable_key=fields[0] if len(fields) > 1 else '',
+                        units=m['units'],
+                        frequency=comment.split()[0],
+                        is_meter=len(fields) == 1
+                    ))
+            self._index = pd.DataFrame(
+                rows, columns=['id', *self.index_columns]
+            ).set_index('id')
+        return self._index
+
+    def _load(self, index: pd.DataFrame) -> pd.DataFrame:
+        ids = {str(i) for i in index.index}
+        environment = None
+        stamp = None
+        # NOTE (<month>, <day>) of the last time stamp of the environment,
+        # by hourly or daily stamps and by monthly stamps
+        last_day = last_month_end = None
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                if line.startswith(self._end_of_dictionary):
+                    break
+            for line in f:
+                code, _, rest = line.partition(',')
+                if code in ids:
+                    if stamp is None:
+                        raise ValueError(f'{self.path}: value without a time stamp: {line!r}')
+                    value, _, _ = rest.partition(',')
+                    records.append((stamp, int(code), float(value)))
+                    continue
+                if code == '1':
+                    environment = rest.split(',')[0].strip()
+                    stamp = last_day = last_month_end = None
+                elif code == '2':
+                    # 2,<day_of_sim>,<month>,<day>,<dst>,<hour>,<start_minute>,<end_minute>,...
+                    fields = rest.split(',')
+                    last_day = int(fields[1]), int(fields[2])
+                    stamp = (
+                        environment, *last_day,
+                        int(fields[4]) - 1 + float(fields[6]) / 60
+                    )
+                elif code == '3':
+                    # 3,<day_of_sim>,<month>,<day>,<dst>,<day_type>
+                    fields = rest.split(',')
+                    last_day = int(fields[1]), int(fields[2])
+                    stamp = (environment, *last_day, 24.)
+                elif code == '4':
+                    # 4,<day_of_sim>,<month>: the end of the month
+                    month = int(rest.split(',')[1])
+                    last_month_end = month, calendar.monthrange(
+                        self.year if self.year is not None else self.default_year,
+                        month
+                    )[1]
+                    stamp = (environment, *last_month_end, 24.)
+                elif code == '5':
+                    # 5,<day_of_sim>: the end of the run period, i.e. of its last day reported
+                    # (by hourly or daily stamps; by monthly stamps only otherwise)
+                    if (last_day or last_month_end) is None:
+                        raise ValueError(
+                            f'{self.path}: run period stamp of {environment!r} '
+                            'without a preceding time stamp to date it'
+                        )
+                    stamp = (environment, *(last_day or last_month_end), 24.)
+                elif line.startswith(self._end_of_data):
+                    break
+
+        df = pd.DataFrame(records, columns=['stamp', 'id', 'value'])
+        # NOTE fails on duplicate stamps instead of aggregating them
+        df = df.pivot(index='stamp', columns='id', values='value')
+        stamps = pd.DataFrame(
+            [*df.index],
+            columns=['environment', 'month', 'day', 'hour']
+        )
+        df.index = pd.MultiIndex.from_arrays(
+            [
+                stamps['environment'].to_numpy(),
+                self._timestamps(
+                    stamps['month'], stamps['day'], stamps['hour'],
+                    np.zeros(len(stamps))
+                )
+            ],
+            names=['environment', 'timestamp']
+        )
+        return df
+
+def load_many(
+    directories: typing.Iterable[str | os.PathLike],
+    specs: pd.DataFrame | typing.Iterable[Results.Specs | typing.Mapping | tuple],
+    max_workers: int = None,
+    **load_kwargs
+) -> pd.DataFrame:
+    """
+    Load the same variables from the outputs of many runs.
+
+    Parameters
+    ----------
+    directories : Iterable[str or PathLike]
+        The output directories of the runs.
+    specs : DataFrame or Iterable
+        See `Results.load`.
+    max_workers : int, optional
+        Number of threads reading the outputs concurrently.
+    **load_kwargs
+        Passed to `Results.load`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The variables of all the runs, with an outer index level `run`
+        (the directory).
+    """
+    directories = [*directories]
+
+    def _load(directory):
+        return Results.open(directory).load(specs, **load_kwargs)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+        return pd.concat(
+            dict(zip(map(str, directories), pool.map(_load, directories))),
+            names=['run']
+        )
+
+__all__ = [
+    Results,
+    SQLiteResults,
+    CSVResults,
+    ESOResults,
+    load_many
+]
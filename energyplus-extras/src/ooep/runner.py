@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import typing
+import threading
+import concurrent.futures
+
+
+# TODO NOTE energyplus runs each state independently: `run_energyplus` (through ctypes)
+# releases the GIL, which is only taken back for the callbacks of the state
+class ThreadRunner:
+    """
+    Run `ooep.ems.Environment`s concurrently in threads of this process.
+
+    Each environment owns its state and its callbacks: callbacks are dispatched
+    on the thread of their state only. The library (and its data) is loaded
+    once for all the runs, as opposed to once per worker process.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Maximum number of concurrent runs.
+
+    Examples
+    --------
+    >>> envs = [ooep.ems.Environment().__enter__() for _ in range(4)]
+    >>> with ThreadRunner() as runner:
+    ...     futures = [
+    ...         runner.submit(env, '--output-directory', f'build/{i}', ...)
+    ...             for i, env in enumerate(envs)
+    ...     ]
+    ...     exit_codes = runner.wait(futures)
+    """
+
+    def __init__(self, max_workers: int = None):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='ooep-runner'
+        )
+        self._lock = threading.Lock()
+        self._running: typing.Set['ooep.ems.Environment'] = set()
+        self._futures: typing.Set[concurrent.futures.Future] = set()
+        # NOTE incremented by `stop`: the runs submitted before are cancelled
+        self._generation = 0
+
+    def _run(self, env: 'ooep.ems.Environment', generation: int, args, kwargs):
+        with self._lock:
+            if generation != self._generation:
+                raise concurrent.futures.CancelledError()
+            if env in self._running:
+                raise RuntimeError(f'environment already running: {env}')
+            self._running.add(env)
+        try:
+            return env(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running.discard(env)
+
+    def submit(
+        self,
+        env: 'ooep.ems.Environment',
+        *args, **kwargs
+    ) -> concurrent.futures.Future:
+        """
+        Schedule `env(*args, **kwargs)`.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Of the exit code of the run.
+        """
+        # NOTE states are created on this thread, ahead of the run
+        if getattr(env, '_ep_state', None) is None:
+            env.__enter__()
+        future = self._executor.submit(self._run, env, self._generation, args, kwargs)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard_future)
+        return future
+
+    def _discard_future(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def map(
+        self,
+        runs: typing.Iterable[typing.Tuple['ooep.ems.Environment', typing.Sequence[str]]],
+        **kwargs
+    ) -> typing.List[int]:
+        """
+        Run each `(env, args)` of `runs` with `kwargs`; wait for all of them.
+
+        Returns
+        -------
+        List[int]
+            The exit codes, in order.
+        """
+        return self.wait([
+            self.submit(env, *args, **kwargs)
+                for env, args in runs
+        ])
+
+    def wait(
+        self,
+        futures: typing.Sequence[concurrent.futures.Future],
+        timeout: float = None
+    ) -> typing.List[typing.Any]:
+        """
+        Wait for `futures`; stop all the runs if interrupted (e.g. by Ctrl+C)
+        or on `timeout` (raising `TimeoutError`).
+        """
+        try:
+            _, not_done = concurrent.futures.wait(futures, timeout=timeout)
+            if not_done:
+                raise concurrent.futures.TimeoutError(
+                    f'{len(not_done)} of {len(futures)} runs not done after {timeout}s'
+                )
+        except BaseException:
+            self.stop()
+            raise
+        return [future.result(timeout=0) for future in futures]
+
+    def stop(self):
+        """
+        Cancel the pending runs and stop the running ones (`stop_simulation`).
+        The runs submitted afterwards are not affected.
+        """
+        with self._lock:
+            self._generation += 1
+            futures = [*self._futures]
+            running = [*self._running]
+        for future in futures:
+            future.cancel()
+        for env in running:
+            env.stop()
+        return self
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *_exc_args):
+        if exc_type is not None:
+            self.stop()
+        self.shutdown(wait=True)
+
+__all__ = [
+    ThreadRunner
+]
@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import abc
+import typing
+import datetime
+import functools
+
+import numpy as np
+import pandas as pd
+
+from . import components
+from .components import NotReadyError
+
+
+# TODO NOTE this module does not require energyplus (nor import `ooep.ems`):
+# surrogates are meant to run where energyplus is unavailable
+
+class Recorder:
+    """
+    Record trajectories of EMS components for fitting surrogates.
+
+    On each dispatch of `event_specs` (by default, at the end of each zone timestep),
+    the values of `components` are appended as a row;
+    rows are indexed by the simulation time.
+
+    Examples
+    --------
+    >>> recorder = Recorder(env, [tzone, emeter, tstat_heat, tstat_cool])
+    >>> env(...)
+    >>> df = recorder.close().to_frame()
+    """
+
+    def __init__(
+        self,
+        env: 'ooep.ems.BaseEnvironment',
+        components: typing.Sequence['ooep.ems.BaseEnvironment.DataComponent'],
+        event_specs: typing.Mapping = dict(
+            event_name='end_zone_timestep_after_zone_reporting'
+        ),
+        skip_warmup: bool = True
+    ):
+        self._env = env
+        self._components = [*components]
+        self._event_specs = event_specs
+        self._skip_warmup = skip_warmup
+        self._index = []
+        self._rows = []
+        self._env.event_listener.subscribe(self._event_specs, self._record)
+
+    def _record(self):
+        if self._skip_warmup and self._env.warming_up:
+            return
+        try:
+            row = [c.value for c in self._components]
+        except self._env.Component.NotReadyError:
+            return
+        self._index.append(self._env.datetime)
+        self._rows.append(row)
+
+    def close(self):
+        self._env.event_listener.unsubscribe(self._event_specs, self._record)
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            np.asarray(self._rows, dtype=np.float64).reshape(
+                len(self._rows), len(self._components)
+            ),
+            index=pd.DatetimeIndex(self._index, name='datetime'),
+            columns=[c.name for c in self._components]
+        )
+
+class Model(abc.ABC):
+    """
+    Batched transition model of a surrogate `Environment`.
+
+    The state is the values of the components named by `states`;
+    the inputs are the values of the actuators named by `inputs`.
+    """
+
+    states: typing.Sequence[str]
+    inputs: typing.Sequence[str]
+
+    @property
+    def input_defaults(self) -> np.ndarray:
+        # NOTE values of the inputs not actuated
+        return np.zeros(len(self.inputs))
+
+    @abc.abstractmethod
+    def step(
+        self,
+        x: np.ndarray,
+        u: np.ndarray,
+        t: datetime.datetime
+    ) -> np.ndarray:
+        """
+        Advance one timestep.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            States, (instances, states).
+        u : numpy.ndarray
+            Inputs applied during the timestep, (instances, inputs).
+        t : datetime.datetime
+            The end of the timestep.
+
+        Returns
+        -------
+        numpy.ndarray
+            The next states, (instances, states).
+        """
+        ...
+
+class LinearModel(Model):
+    """
+    Linear state-space model with daily (time-of-day) terms:
+    `x[k] = A x[k-1] + B u[k] + D phi(t[k]) + c`,
+    where `phi(t) = (sin, cos)` of the time of day.
+    """
+
+    def __init__(
+        self,
+        states: typing.Sequence[str],
+        inputs: typing.Sequence[str],
+        A: np.ndarray, B: np.ndarray, D: np.ndarray, c: np.ndarray,
+        input_defaults: np.ndarray = None,
+        residual_std: np.ndarray = None
+    ):
+        self.states = [*states]
+        self.inputs = [*inputs]
+        self.A, self.B, self.D, self.c = (
+            np.asarray(a, dtype=np.float64) for a in (A, B, D, c)
+        )
+        self._input_defaults = (
+            np.zeros(len(self.inputs)) if input_defaults is None else
+            np.asarray(input_defaults, dtype=np.float64)
+        )
+        self.residual_std = (
+            np.zeros(len(self.states)) if residual_std is None else
+            np.asarray(residual_std, dtype=np.float64)
+        )
+
+    @property
+    def input_defaults(self):
+        return self._input_defaults
+
+    @staticmethod
+    def _time_features(t: typing.Sequence[datetime.datetime] | pd.DatetimeIndex):
+        t = pd.DatetimeIndex(t)
+        a = 2 * np.pi * (t.hour * 3600 + t.minute * 60 + t.second) / 86400
+        return np.stack([np.sin(a), np.cos(a)], axis=-1)
+
+    @classmethod
+    def fit(
+        cls,
+        trajectories: pd.DataFrame | typing.Iterable[pd.DataFrame],
+        states: typing.Sequence[str],
+        inputs: typing.Sequence[str],
+        ridge: float = 1e-6
+    ) -> 'LinearModel':
+        """
+        Fit by (ridge) least squares.
+
+        Parameters
+        ----------
+        trajectories : pandas.DataFrame or Iterable[pandas.DataFrame]
+            Recorded by `Recorder` (one frame per run):
+            indexed by time, with a column per state and input.
+        states : Sequence[str]
+            Names of the columns of the states.
+        inputs : Sequence[str]
+            Names of the columns of the inputs.
+        ridge : float
+            Regularization.
+        """
+        if isinstance(trajectories, pd.DataFrame):
+            trajectories = [trajectories]
+        states, inputs = [*states], [*inputs]
+
+        Xs, Ys, us = [], [], []
+        for df in trajectories:
+            x = df[states].to_numpy(dtype=np.float64)
+            u = df[inputs].to_numpy(dtype=np.float64)
+            Xs.append(np.hstack([
+                x[:-1], u[1:],
+                cls._time_features(df.index[1:]),
+                np.ones((len(df) - 1, 1))
+            ]))
+            Ys.append(x[1:])
+            us.append(u)
+        X, Y = np.vstack(Xs), np.vstack(Ys)
+
+        n_s, n_u = len(states), len(inputs)
+        # NOTE normalize the columns for a well-conditioned ridge
+        scale = np.abs(X).max(axis=0)
+        scale[scale == 0] = 1.
+        Xn = X / scale
+        W = np.linalg.solve(
+            Xn.T @ Xn + ridge * len(X) * np.eye(X.shape[1]),
+            Xn.T @ Y
+        ) / scale[:, np.newaxis]
+
+        return cls(
+            states=states,
+            inputs=inputs,
+            A=W[:n_s].T,
+            B=W[n_s:n_s + n_u].T,
+            D=W[n_s + n_u:n_s + n_u + 2].T,
+            c=W[-1],
+            input_defaults=np.vstack(us).mean(axis=0),
+            residual_std=(Y - X @ W).std(axis=0)
+        )
+
+    def step(self, x, u, t):
+        a = 2 * np.pi * (t.hour * 3600 + t.minute * 60 + t.second) / 86400
+        return (
+            x @ self.A.T
+            + u @ self.B.T
+            + (self.D @ (np.sin(a), np.cos(a)) + self.c)
+        )
+
+class Environment(components.ComponentRegistry):
+    """
+    Surrogate of `ooep.ems.Environment` driven by a `Model`.
+
+    Exposes the same `variable`/`meter`/`internal_variable`/`actuator`/`event`
+    surface, stepping `n_instances` instances at once: with more than one
+    instance, component values are arrays of shape (instances,) and actuators
+    accept scalars or such arrays.
+
+    The events dispatched, in order, are
+    `begin_new_environment`, `after_new_environment_warmup_complete`,
+    then on each timestep `begin_zone_timestep_after_init_heat_balance`
+    (before the model step) and `end_zone_timestep_after_zone_reporting` (after),
+    and `progress` on each percent. The other events are accepted but never dispatched.
+
+    Examples
+    --------
+    >>> model = LinearModel.fit(df, states=[...], inputs=[...])
+    >>> with Environment(model, n_instances=4096) as env:
+    ...     controller(env)     # unchanged
+    ...     env(episode=(datetime.date(2006, 3, 5), 7))
+    """
+
+    Component = components.Component
+
+    class DataComponent(Component):
+        __slots__ = ('_index',)
+
+        def __init__(self, specs, environment):
+            super().__init__(specs, environment)
+            try:
+                self._index = self._env._model.states.index(self.name)
+            except ValueError:
+                raise KeyError(f'not a state of the model: {self.name}')
+
+        @property
+        def value(self):
+            x = self._env._x
+            if x is None:
+                raise self.NotReadyError()
+            return self._env._squeeze(x[:, self._index])
+
+    class Actuator(Component):
+        __slots__ = ('_index',)
+
+        class Specs(typing.NamedTuple):
+            component_type: str
+            control_type: str
+            actuator_key: str
+
+        def __init__(self, specs, environment):
+            super().__init__(specs, environment)
+            try:
+                self._index = self._env._model.inputs.index(self.name)
+            except ValueError:
+                raise KeyError(f'not an input of the model: {self.name}')
+
+        @property
+        def value(self):
+            if self._env._x is None:
+                raise self.NotReadyError()
+            return self._env._squeeze(self._env._u[:, self._index])
+
+        @value.setter
+        def value(self, n: float | np.ndarray):
+            if self._env._x is None:
+                raise self.NotReadyError()
+            self._env._u[:, self._index] = n
+
+        def reset(self):
+            self._env.reset_actuators([self])
+
+    class InternalVariable(DataComponent):
+        __slots__ = ()
+
+        class Specs(typing.NamedTuple):
+            variable_type: str
+            variable_key: str
+
+    class Meter(DataComponent):
+        __slots__ = ()
+
+        class Specs(typing.NamedTuple):
+            meter_name: str
+
+    class Variable(DataComponent):
+        __slots__ = ()
+
+        class Specs(typing.NamedTuple):
+            variable_name: str
+            variable_key: str
+
+    class Event(Component):
+        __slots__ = ()
+
+        class Specs(typing.NamedTuple):
+            event_name: str
+
+        @property
+        def callback(self):
+            raise NotImplementedError('function not available: callbacks are write-only')
+
+        @callback.setter
+        def callback(self, f: typing.Callable):
+            self._env._callbacks[self._specs] = f
+
+    def __init__(
+        self,
+        model: Model,
+        n_instances: int = 1,
+        timestep: datetime.timedelta = datetime.timedelta(minutes=10),
+        noise: bool = False,
+        rng: np.random.Generator = None
+    ):
+        self._model = model
+        self.n_instances = n_instances
+        self.timestep = timestep
+        self._noise = noise
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._callbacks: typing.Dict[Environment.Event.Specs, typing.Callable] = dict()
+        self._x = None
+        self._u = None
+        self._datetime = None
+        self._stopped = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_args):
+        self._x = self._u = None
+
+    def _squeeze(self, a: np.ndarray):
+        return float(a[0]) if self.n_instances == 1 else a
+
+    def actuator(self, specs) -> Actuator:
+        return self._component(specs, self.Actuator)
+
+    def reset_actuators(self, actuators: typing.Iterable[Actuator] = None):
+        if self._u is None:
+            return
+        if actuators is None:
+            self._u[:] = self._model.input_defaults
+            return
+        for actuator in actuators:
+            self._u[:, actuator._index] = self._model.input_defaults[actuator._index]
+
+    def internal_variable(self, specs) -> InternalVariable:
+        return self._component(specs, self.InternalVariable)
+
+    def meter(self, specs) -> Meter:
+        return self._component(specs, self.Meter)
+
+    def variable(self, specs) -> Variable:
+        return self._component(specs, self.Variable)
+
+    def event(self, specs) -> Event:
+        return self._component(specs, self.Event)
+
+    @property
+    def datetime(self):
+        return self._datetime
+
+    @property
+    def warming_up(self):
+        return False
+
+    def _dispatch(self, event_name: str, *args):
+        f = self._callbacks.get(self.Event.Specs(event_name))
+        if f is None:
+            return
+        try:
+            f(*args)
+        except Exception as e:
+            self.stop()
+            raise e
+
+    def __call__(
+        self,
+        *args,
+        verbose: bool = False,
+        episode: 'ooep.ems.BaseEnvironment.Episode | typing.Tuple[datetime.date, int]' = None,
+        initial_state: np.ndarray = None
+    ):
+        """
+        Run an episode; a drop-in for `ooep.ems.Environment.__call__`.
+
+        Parameters
+        ----------
+        *args
+            The energyplus command line arguments; ignored.
+        verbose : bool
+            Ignored.
+        episode : ooep.ems.BaseEnvironment.Episode or (start, days)
+            The window to simulate; required.
+        initial_state : numpy.ndarray, optional
+            The states at the start, (states,) or (instances, states);
+            all zeros if omitted.
+        """
+        if episode is None:
+            raise ValueError('episode required: a surrogate has no run period of its own')
+        start, days = episode[0], episode[1]
+        if not isinstance(start, datetime.datetime):
+            start = datetime.datetime.combine(start, datetime.time())
+        n_steps = int(datetime.timedelta(days=days) / self.timestep)
+
+        n, m = self.n_instances, self._model
+        self._x = np.zeros((n, len(m.states)))
+        if initial_state is not None:
+            self._x[:] = initial_state
+        self._u = np.tile(m.input_defaults, (n, 1)).astype(np.float64)
+        self._datetime = start
+        self._stopped = False
+
+        residual_std = getattr(m, 'residual_std', None)
+        self._dispatch('begin_new_environment')
+        self._dispatch('after_new_environment_warmup_complete')
+        progress = -1
+        for k in range(n_steps):
+            if self._stopped:
+                break
+            self._datetime = start + (k + 1) * self.timestep
+            self._dispatch('begin_zone_timestep_after_init_heat_balance')
+            x = m.step(self._x, self._u, self._datetime)
+            if self._noise and residual_std is not None:
+                x = x + self._rng.standard_normal(x.shape) * residual_std
+            self._x = x
+            self._dispatch('end_zone_timestep_after_zone_reporting')
+            if (p := 100 * (k + 1) // n_steps) != progress:
+                progress = p
+                self._dispatch('progress', progress)
+
+        return 0
+
+    def stop(self):
+        self._stopped = True
+
+    def reset(self):
+        self._stopped = False
+
+    EventListener = components.EventListener
+
+    @functools.cached_property
+    def event_listener(self):
+        return self.EventListener(self)
+
+__all__ = [
+    NotReadyError,
+    Recorder,
+    Model,
+    LinearModel,
+    Environment
+]
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import typing
+import os
+import json
+import time
+import pathlib
+import traceback
+import collections
+import multiprocessing
+import multiprocessing.connection
+
+import pandas as pd
+
+
+class Job(typing.NamedTuple):
+    # NOTE unique across the sweep; identifies the job in the journal
+    key: str
+    params: typing.Mapping[str, typing.Any]
+
+class Journal:
+    """
+    Append-only record of finished jobs (JSON lines); the checkpoint of a sweep.
+
+    Each record has the `key` and `params` of the job, its `runtime_key`
+    (see `Sweep`), its `status` (`'done'` or `'failed'`), its `runtime`
+    in seconds, and either its `metrics` or its `error`.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = pathlib.Path(path)
+
+    def __iter__(self) -> typing.Iterator[typing.Mapping]:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try: yield json.loads(line)
+                # NOTE a partial line from an interrupted write
+                except json.JSONDecodeError: pass
+
+    def append(self, record: typing.Mapping):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def latest(self) -> typing.Dict[str, typing.Mapping]:
+        return {record['key']: record for record in self}
+
+def _worker(conn: multiprocessing.connection.Connection, func: typing.Callable):
+    conn.send(None)
+    while (job := conn.recv()) is not None:
+        job = Job(*job)
+        t_start = time.monotonic()
+        try:
+            record = dict(
+                status='done',
+                metrics=dict(func(**job.params) or {})
+            )
+        except Exception:
+            record = dict(status='failed', error=traceback.format_exc())
+        conn.send(dict(
+            key=job.key,
+            runtime=time.monotonic() - t_start,
+            **record
+        ))
+
+class Sweep:
+    """
+    Scheduler of long-running jobs over local worker processes.
+
+    - Jobs are ordered longest-first by their estimated runtimes (from the
+      journals of past sweeps, grouped by `runtime_key`) and partitioned
+      among the workers' deques; an idle worker steals the longest job left
+      (from the front) of the deque with the most work left.
+    - Finished jobs are journaled as they finish: a killed sweep resumes
+      without repeating them.
+    - The summary metrics returned by `func` are aggregated by `to_frame`.
+
+    Examples
+    --------
+    >>> def run(model, weather, controller):
+    ...     with ooep.ems.Environment() as env:
+    ...         ...
+    ...         return dict(energy=..., discomfort=...)
+    >>> sweep = Sweep(
+    ...     run,
+    ...     [Job(f'{m}-{w}-{c}', dict(model=m, weather=w, controller=c)) for ...],
+    ...     directory='build/sweep',
+    ...     runtime_key=lambda job: job.params['model']
+    ... )
+    >>> sweep.run().to_frame()
+    """
+
+    def __init__(
+        self,
+        func: typing.Callable[..., typing.Mapping[str, typing.Any]],
+        jobs: typing.Iterable[Job | typing.Tuple[str, typing.Mapping]],
+        directory: str | os.PathLike,
+        n_workers: int = None,
+        runtime_key: typing.Callable[[Job], typing.Hashable] = None,
+        history: typing.Iterable[str | os.PathLike] = (),
+        mp_context: str = None
+    ):
+        self._func = func
+        self._jobs = {job.key: job for job in (Job(*j) for j in jobs)}
+        self.directory = pathlib.Path(directory)
+        self.journal = Journal(self.directory / 'journal.jsonl')
+        self._n_workers = n_workers or os.cpu_count()
+        self._runtime_key = runtime_key or (lambda job: job.key)
+        self._history = [Journal(path) for path in history]
+        self._mp_context = multiprocessing.get_context(mp_context)
+
+    # NOTE runtime keys compare by their JSON, as journaled
+    @staticmethod
+    def _dumps_key(runtime_key: typing.Hashable) -> str:
+        return json.dumps(runtime_key, default=str, sort_keys=True)
+
+    def _record_runtime_key(self, record: typing.Mapping) -> str | None:
+        if 'runtime_key' in record:
+            return self._dumps_key(record['runtime_key'])
+        # NOTE records of older journals: from the job or its params
+        job = self._jobs.get(record['key'])
+        if job is None and 'params' in record:
+            job = Job(record['key'], record['params'])
+        if job is None:
+            return None
+        try: return self._dumps_key(self._runtime_key(job))
+        except (KeyError, IndexError, TypeError, AttributeError): return None
+
+    def estimates(self, jobs: typing.Iterable[Job]) -> typing.Dict[str, float]:
+        """
+        Estimate the runtimes of `jobs` from the journals:
+        the mean runtime of the finished jobs with the same `runtime_key`,
+        from this sweep or any other (e.g. with a different grid);
+        the mean of all the finished jobs if none.
+        """
+        runtimes = collections.defaultdict(list)
+        for journal in (self.journal, *self._history):
+            for record in journal:
+                if record.get('status') != 'done' or record.get('runtime') is None:
+                    continue
+                runtime_key = self._record_runtime_key(record)
+                if runtime_key is None:
+                    continue
+                runtimes[runtime_key].append(record['runtime'])
+
+        means = {k: sum(v) / len(v) for k, v in runtimes.items()}
+        default = sum(means.values()) / len(means) if means else 1.
+        return {
+            job.key: means.get(self._dumps_key(self._runtime_key(job)), default)
+                for job in jobs
+        }
+
+    def pending(self, retry_failed: bool = True) -> typing.List[Job]:
+        latest = self.journal.latest()
+        return [
+            job for key, job in self._jobs.items()
+                if key not in latest
+                or (retry_failed and latest[key]['status'] != 'done')
+        ]
+
+    def _partition(self, jobs: typing.List[Job], estimates, n: int):
+        # NOTE longest processing time first: each job goes to the least loaded deque
+        deques = [collections.deque() for _ in range(n)]
+        loads = [0.] * n
+        for job in sorted(jobs, key=lambda job: estimates[job.key], reverse=True):
+            i = min(range(n), key=loads.__getitem__)
+            deques[i].append(job)
+            loads[i] += estimates[job.key]
+        return deques, loads
+
+    def run(self, retry_failed: bool = True):
+        jobs = self.pending(retry_failed=retry_failed)
+        if not jobs:
+            return self
+        estimates = self.estimates(jobs)
+        n = min(self._n_workers, len(jobs))
+        deques, loads = self._partition(jobs, estimates, n)
+
+        def _next_job(i):
+            if not deques[i]:
+                victims = [j for j in range(n) if deques[j]]
+                if not victims:
+                    return None
+                victim = max(victims, key=loads.__getitem__)
+                # NOTE deques are longest-first: the front is the longest job left
+                job = deques[victim].popleft()
+                loads[victim] -= estimates[job.key]
+                return job
+            job = deques[i].popleft()
+            loads[i] -= estimates[job.key]
+            return job
+
+        def _spawn():
+            parent_conn, child_conn = self._mp_context.Pipe()
+            proc = self._mp_context.Process(
+                target=_worker, args=(child_conn, self._func), daemon=True
+            )
+            proc.start()
+            child_conn.close()
+            return parent_conn, proc
+
+        workers = [_spawn() for _ in range(n)]
+        running: typing.List[Job | None] = [None] * n
+        try:
+            while any(conn is not None for conn, _ in workers):
+                conns = {conn: i for i, (conn, _) in enumerate(workers) if conn is not None}
+                for conn in multiprocessing.connection.wait(conns):
+                    i = conns[conn]
+                    try:
+                        record = conn.recv()
+                    except EOFError:
+                        # NOTE the worker died (e.g. energyplus crashed): respawn
+                        workers[i][1].join()
+                        record = running[i] and dict(
+                            key=running[i].key, runtime=None, status='failed',
+                            error=f'worker exited with code {workers[i][1].exitcode}'
+                        )
+                        workers[i] = _spawn()
+                        conn = workers[i][0]
+                        conn.recv()
+
+                    if record is not None:
+                        job = self._jobs[record['key']]
+                        self.journal.append(dict(
+                            record,
+                            params=job.params,
+                            runtime_key=self._runtime_key(job)
+                        ))
+
+                    running[i] = _next_job(i)
+                    if running[i] is None:
+                        conn.send(None)
+                        conn.close()
+                        workers[i][1].join()
+                        workers[i] = (None, workers[i][1])
+                    else:
+                        conn.send(tuple(running[i]))
+        finally:
+            for conn, proc in workers:
+                if conn is not None:
+                    proc.terminate()
+                    proc.join()
+
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Aggregate the latest record of each job of this sweep.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Indexed by job `key`; the columns `status`, `runtime`, `error`,
+            and one per metric.
+        """
+        records = [
+            record for key, record in self.journal.latest().items()
+                if key in self._jobs
+        ]
+        df = pd.DataFrame.from_records(
+            [
+                dict(
+                    key=record['key'],
+                    status=record['status'],
+                    runtime=record['runtime'],
+                    error=record.get('error'),
+                    **record.get('metrics', {})
+                ) for record in records
+            ],
+            columns=None if records else ['key', 'status', 'runtime', 'error']
+        )
+        return df.set_index('key')
+
+__all__ = [
+    Job,
+    Journal,
+    Sweep
+]
@@ -1,7 +1,8 @@
-from . import containers, energyplus, monkey
+from . import containers, energyplus, models, monkey
 
 __all__ = [
     containers,
     energyplus,
+    models,
     monkey
 ]
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import re
+import json
+import typing
+import hashlib
+import pathlib
+import datetime
+import tempfile
+
+
+class Episode(typing.NamedTuple):
+    start: datetime.date
+    days: int = 7
+    # NOTE minimum number of warm-up days; energyplus still warms up until convergence
+    warmup_days: int = 1
+
+    @property
+    def end(self) -> datetime.date:
+        return self.start + datetime.timedelta(days=self.days - 1)
+
+    @classmethod
+    def sample(
+        cls,
+        year: int,
+        days: int = 7,
+        warmup_days: int = 1,
+        rng: 'numpy.random.Generator | random.Random' = None
+    ) -> 'Episode':
+        # NOTE episodes do not wrap around the end of the year
+        n_starts = (
+            datetime.date(year + 1, 1, 1) - datetime.date(year, 1, 1)
+        ).days - days + 1
+        if rng is None:
+            import random
+            rng = random.Random()
+        i = int(
+            rng.integers(n_starts) if hasattr(rng, 'integers') else
+            rng.randrange(n_starts)
+        )
+        return cls(
+            start=datetime.date(year, 1, 1) + datetime.timedelta(days=i),
+            days=days,
+            warmup_days=warmup_days
+        )
+
+class IDF:
+    # TODO NOTE objects are `<class>, <field>, ..., <field>;` with `!` comments to end of line
+    _comment_pattern = re.compile(r'!.*')
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def _clean(self):
+        # NOTE blank out the comments (same length) to locate the objects in the original text
+        return self._comment_pattern.sub(lambda m: ' ' * len(m.group()), self.text)
+
+    def _objects(self, clean: str):
+        start = 0
+        for m in re.finditer(';', clean):
+            # spans of the class name and the fields
+            spans, i = [], start
+            for j in (*(c.start() for c in re.finditer(',', clean[start:m.start()])), None):
+                j = m.start() if j is None else start + j
+                spans.append((i, j))
+                i = j + 1
+            name, *fields = [clean[i:j].strip() for i, j in spans]
+            yield name.lower(), fields, spans, (start, m.end())
+            start = m.end()
+
+    def patch(
+        self,
+        patches: typing.Mapping[str, typing.Callable[[typing.List[str]], typing.List[str] | None]]
+    ) -> 'IDF':
+        # NOTE `patches` map lowercase class names to functions of the fields:
+        # returning new fields (or `None` to remove the object);
+        # the fields left unchanged keep their formatting and comments
+        clean = self._clean()
+        chunks, end = [], 0
+        for name, fields, spans, (start, stop) in self._objects(clean):
+            f = patches.get(name)
+            if f is None:
+                continue
+            new_fields = f([*fields])
+            if new_fields is None:
+                chunks.append(self.text[end:start])
+                end = stop
+                continue
+            for (i, j), old, new in zip(spans[1:], fields, new_fields):
+                if new == old:
+                    continue
+                chunks.append(self.text[end:i])
+                # NOTE keep the whitespace (and comments) around the value
+                value = clean[i:j]
+                lead = len(value) - len(value.lstrip())
+                chunks.append(self.text[i:i + lead] + new)
+                end = i + lead + len(old)
+            if len(new_fields) > len(fields):
+                # NOTE before the terminating `;`
+                chunks.append(self.text[end:stop - 1])
+                chunks.append(''.join(f',\n  {v}' for v in new_fields[len(fields):]))
+                end = stop - 1
+        chunks.append(self.text[end:])
+        return type(self)(''.join(chunks))
+
+def _pad(fields: typing.List, n: int, fill=''):
+    return fields + [fill] * (n - len(fields))
+
+def _idf_episode_patches(episode: Episode):
+    begin, end = episode.start, episode.end
+    n_run_periods = 0
+
+    # TODO NOTE ref https://bigladdersoftware.com/epx/docs/9-6/input-output-reference/group-location-climate-weather-file-access.html#runperiod
+    def _run_period(fields):
+        nonlocal n_run_periods
+        n_run_periods += 1
+        # NOTE only the first run period is kept
+        if n_run_periods > 1:
+            return None
+        fields = _pad(fields, 8)
+        fields[1:8] = [
+            str(begin.month), str(begin.day), str(begin.year),
+            str(end.month), str(end.day), str(end.year),
+            begin.strftime('%A')
+        ]
+        return fields
+
+    def _building(fields):
+        fields = _pad(fields, 8)
+        fields[7] = str(episode.warmup_days)
+        return fields
+
+    return {'runperiod': _run_period, 'building': _building}
+
+def _epjson_patch_episode(model: typing.MutableMapping, episode: Episode):
+    begin, end = episode.start, episode.end
+    run_periods = model.get('RunPeriod', {})
+    name, run_period = next(iter(run_periods.items()), ('Run Period 1', {}))
+    model['RunPeriod'] = {name: {
+        **run_period,
+        'begin_month': begin.month, 'begin_day_of_month': begin.day,
+        'begin_year': begin.year,
+        'end_month': end.month, 'end_day_of_month': end.day,
+        'end_year': end.year,
+        'day_of_week_for_start_day': begin.strftime('%A')
+    }}
+    for building in model.get('Building', {}).values():
+        building['minimum_number_of_warmup_days'] = episode.warmup_days
+    return model
+
+_model_suffixes = ('.idf', '.imf', '.epjson', '.json')
+
+def episode_model(
+    path: str | os.PathLike,
+    episode: Episode,
+    cache_dir: str | os.PathLike = None
+) -> pathlib.Path:
+    # NOTE a copy of the model at `path` simulating only `episode`;
+    # cached by the model's path, modification time, size and the episode
+    path = pathlib.Path(path).resolve()
+    if path.suffix.lower() not in _model_suffixes:
+        raise ValueError(f'unsupported model format: {path}')
+
+    stat = path.stat()
+    key = hashlib.sha1(
+        f'{path}:{stat.st_mtime_ns}:{stat.st_size}:{tuple(episode)}'.encode()
+    ).hexdigest()
+    cache_dir = pathlib.Path(
+        cache_dir if cache_dir is not None else
+        os.path.join(tempfile.gettempdir(), 'ooep-episodes')
+    )
+    res_path = cache_dir / f'{path.stem}-{key[:16]}{path.suffix}'
+    if res_path.exists():
+        return res_path
+
+    text = path.read_text()
+    if path.suffix.lower() in ('.epjson', '.json'):
+        text = json.dumps(_epjson_patch_episode(json.loads(text), episode))
+    else:
+        text = IDF(text).patch(_idf_episode_patches(episode)).text
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # NOTE write then rename: concurrent runs never see a partial copy
+    with tempfile.NamedTemporaryFile(
+        'w', dir=cache_dir, suffix=path.suffix, delete=False
+    ) as f:
+        f.write(text)
+    os.replace(f.name, res_path)
+    return res_path
+
+__all__ = [
+    Episode,
+    IDF,
+    episode_model
+]
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import typing
+import os
+import io
+import csv
+import datetime
+import pathlib
+import hashlib
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+# TODO NOTE ref https://bigladdersoftware.com/epx/docs/9-6/auxiliary-programs/energyplus-weather-file-epw-data-dictionary.html
+class EPW:
+    _n_header_lines = 8
+
+    # NOTE all the fields of a data record; the non-numeric ones are not loaded
+    _fields = (
+        'year', 'month', 'day', 'hour', 'minute',
+        'data_source_and_uncertainty_flags',
+        'dry_bulb_temperature', 'dew_point_temperature',
+        'relative_humidity', 'atmospheric_station_pressure',
+        'extraterrestrial_horizontal_radiation',
+        'extraterrestrial_direct_normal_radiation',
+        'horizontal_infrared_radiation_intensity',
+        'global_horizontal_radiation', 'direct_normal_radiation',
+        'diffuse_horizontal_radiation',
+        'global_horizontal_illuminance', 'direct_normal_illuminance',
+        'diffuse_horizontal_illuminance', 'zenith_luminance',
+        'wind_direction', 'wind_speed',
+        'total_sky_cover', 'opaque_sky_cover',
+        'visibility', 'ceiling_height',
+        'present_weather_observation', 'present_weather_codes',
+        'precipitable_water', 'aerosol_optical_depth',
+        'snow_depth', 'days_since_last_snowfall',
+        'albedo',
+        'liquid_precipitation_depth', 'liquid_precipitation_quantity'
+    )
+    _non_numeric_fields = (
+        'data_source_and_uncertainty_flags',
+        'present_weather_codes'
+    )
+    columns = tuple(
+        sorted(
+            set(_fields) - set(_non_numeric_fields),
+            key=_fields.index
+        )
+    )
+
+    # TODO NOTE the table is padded with the first `lookahead` hours
+    # so that forecasts wrap around the end of the year without copying
+    lookahead = 24 * 7
+
+    class Header(typing.NamedTuple):
+        lines: typing.Sequence[str]
+        records_per_hour: int
+
+    @classmethod
+    def _read_header(cls, path: str | os.PathLike) -> Header:
+        with open(path, 'r', newline='') as f:
+            lines = [f.readline() for _ in range(cls._n_header_lines)]
+        data_periods, = csv.reader(io.StringIO(lines[-1]))
+        # NOTE DATA PERIODS,<n_periods>,<records_per_hour>,...
+        return cls.Header(lines=lines, records_per_hour=int(data_periods[2]))
+
+    @classmethod
+    def _parse(cls, path: str | os.PathLike) -> np.ndarray:
+        df = pd.read_csv(
+            path,
+            skiprows=cls._n_header_lines,
+            header=None,
+            names=cls._fields,
+            usecols=cls.columns,
+            dtype=np.float64
+        )
+        return df[[*cls.columns]].to_numpy(dtype=np.float64).T
+
+    @classmethod
+    def cache_path(cls, path: str | os.PathLike) -> pathlib.Path:
+        path = pathlib.Path(path)
+        return path.with_name(f'{path.name}.npy')
+
+    @classmethod
+    def _cache_paths(cls, path: str | os.PathLike) -> typing.List[pathlib.Path]:
+        # NOTE next to `path`, then in a user cache directory
+        # for read-only sources (e.g. the `WeatherData` of an energyplus install)
+        path = pathlib.Path(path)
+        key = hashlib.sha1(str(path.resolve()).encode()).hexdigest()
+        return [
+            cls.cache_path(path),
+            pathlib.Path(tempfile.gettempdir()) / 'ooep-weather' / f'{path.name}-{key[:16]}.npy'
+        ]
+
+    @staticmethod
+    def _save_cache(cache_path: pathlib.Path, table: np.ndarray) -> bool:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f'.{cache_path.name}.{os.getpid()}.{threading.get_ident()}')
+            try:
+                with open(tmp_path, 'xb') as f:
+                    np.save(f, table)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return False
+        return True
+
+    def __init__(self, path: str | os.PathLike, cache: bool = True):
+        """
+        Columnar table of an `.epw` weather file.
+
+        The numeric fields are parsed once into a (columns x records) table;
+        with `cache`, the table is saved next to `path` (or, if that fails,
+        in a cache directory under `tempfile.gettempdir()`) and memory-mapped
+        on subsequent loads; it stays in memory if neither can be written.
+
+        Parameters
+        ----------
+        path : str or PathLike
+            Path to the `.epw` file.
+        cache : bool
+            Whether to use (and create) the cache.
+        """
+        self.path = pathlib.Path(path)
+        self.header = self._read_header(self.path)
+
+        cache_paths = self._cache_paths(self.path) if cache else []
+        mtime = self.path.stat().st_mtime
+        cache_path = next((
+            p for p in cache_paths
+                if p.exists() and p.stat().st_mtime >= mtime
+        ), None)
+        if cache_path is not None:
+            self.table = np.load(cache_path, mmap_mode='r')
+        else:
+            table = self._parse(self.path)
+            n_pad = min(
+                self.lookahead * self.header.records_per_hour,
+                table.shape[1]
+            )
+            table = np.concatenate((table, table[:, :n_pad]), axis=1)
+            for cache_path in cache_paths:
+                if self._save_cache(cache_path, table):
+                    table = np.load(cache_path, mmap_mode='r')
+                    break
+            self.table = table
+
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._n_records = (
+            self.table.shape[1]
+            - min(
+                self.lookahead * self.header.records_per_hour,
+                self.table.shape[1] // 2
+            )
+        )
+
+        # lookahead index: (<month>, <day>) -> first record of the day
+        self._day_index = np.full((13, 32), -1, dtype=np.int64)
+        months = self.column('month').astype(np.int64)
+        days = self.column('day').astype(np.int64)
+        first = np.flatnonzero(
+            np.r_[True, (months[1:] != months[:-1]) | (days[1:] != days[:-1])]
+        )
+        # NOTE reversed: the earliest record of a day wins
+        self._day_index[months[first][::-1], days[first][::-1]] = first[::-1]
+
+    def __len__(self):
+        return self._n_records
+
+    @property
+    def records_per_hour(self) -> int:
+        return self.header.records_per_hour
+
+    def column(self, name: str) -> np.ndarray:
+        return self.table[self._column_index[name], :self._n_records]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.table[:, :self._n_records].T,
+            columns=self.columns
+        )
+
+    def index(self, sim_time: datetime.datetime | typing.Any) -> int:
+        """
+        Locate the record covering a point in time.
+
+        Parameters
+        ----------
+        sim_time : datetime.datetime or Any
+            Anything else must have one as `.datetime`,
+            e.g. an `ooep.ems.Environment` during a run.
+
+        Returns
+        -------
+        int
+            The index of the record.
+
+        Notes
+        -----
+        02/29 maps to the records of 02/28 in files without it (e.g. TMY files)
+        for runs of leap years.
+        """
+        if not isinstance(sim_time, datetime.datetime):
+            sim_time = sim_time.datetime
+        i = self._day_index[sim_time.month, sim_time.day]
+        if i < 0 and (sim_time.month, sim_time.day) == (2, 29):
+            i = self._day_index[2, 28]
+        if i < 0:
+            raise KeyError(f'no record of {sim_time:%m/%d} in {self.path}')
+        rph = self.header.records_per_hour
+        return int(i + sim_time.hour * rph + sim_time.minute * rph // 60)
+
+    def forecast(
+        self,
+        sim_time: datetime.datetime | typing.Any,
+        horizon: float = 24.,
+        column: str = None
+    ) -> np.ndarray:
+        """
+        Slice the records of the next `horizon` hours from `sim_time`.
+
+        Parameters
+        ----------
+        sim_time : datetime.datetime or Any
+            See `index`.
+        horizon : float
+            Number of hours.
+        column : str, optional
+            The column to slice; all the columns if omitted.
+
+        Returns
+        -------
+        numpy.ndarray
+            A view of the table: (records,) for a single column;
+            (columns, records) otherwise. Copies only when `horizon`
+            wraps around the end of the year beyond `lookahead`.
+        """
+        start = self.index(sim_time)
+        stop = start + int(horizon * self.header.records_per_hour)
+        rows = (
+            self.table
+            if column is None else
+            self.table[self._column_index[column]]
+        )
+        if stop <= self.table.shape[1]:
+            return rows[..., start:stop]
+        return np.take(
+            rows[..., :self._n_records],
+            range(start, stop), axis=-1, mode='wrap'
+        )
+
+__all__ = [
+    EPW
+]
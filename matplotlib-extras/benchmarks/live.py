@@ -0,0 +1,278 @@
+"""
+Benchmarks of the live plotting path of `matplotlib_extras` (headless, Agg).
+
+Reports the per-frame latency percentiles and the memory growth per frame of:
+
+- `Line2D.append_data` / `Line2D.extend_data` at growing history lengths
+- `FlexArtist` autofit (`refit`)
+- `BlitManager.update` with 1 to 12 axes
+- `FigureAnimation.step` with many artists
+- `FigureAnimation.capture` (headless export) with and without autofit;
+  checks that rescaled axes are fully redrawn
+
+Examples
+--------
+.. code-block:: sh
+
+    python benchmarks/live.py
+    python benchmarks/live.py --quick --save baseline.json
+    python benchmarks/live.py --compare baseline.json --tolerance .2 --repeat 3
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+import typing
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.figure
+import matplotlib.pyplot as plt
+import numpy as np
+
+import matplotlib_extras.animation
+import matplotlib_extras.lines
+
+
+class Result(typing.NamedTuple):
+    name: str
+    params: typing.Mapping[str, typing.Any]
+    n_frames: int
+    # NOTE milliseconds
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    # NOTE bytes per frame
+    mem_growth: float
+
+    @property
+    def key(self):
+        return f'''{self.name}[{str.join(',', (f'{k}={v}' for k, v in self.params.items()))}]'''
+
+# NOTE a case is a function of its params returning a frame function (fresh state)
+Case = typing.Callable[..., typing.Callable[[], typing.Any]]
+
+def measure(
+    name: str,
+    case: Case,
+    params: typing.Mapping[str, typing.Any],
+    n_frames: int,
+    n_warmup: int = 5
+) -> Result:
+    # latencies: untraced
+    frame = case(**params)
+    for _ in range(n_warmup):
+        frame()
+    latencies = np.empty(n_frames)
+    perf_counter = time.perf_counter
+    for i in range(n_frames):
+        t_start = perf_counter()
+        frame()
+        latencies[i] = perf_counter() - t_start
+    plt.close('all')
+
+    # memory growth: traced, from fresh state
+    frame = case(**params)
+    for _ in range(n_warmup):
+        frame()
+    tracemalloc.start()
+    try:
+        mem_start, _ = tracemalloc.get_traced_memory()
+        for _ in range(n_frames):
+            frame()
+        mem_stop, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    plt.close('all')
+
+    p50, p90, p99, pmax = np.percentile(latencies * 1e3, [50, 90, 99, 100])
+    return Result(
+        name=name, params=dict(params), n_frames=n_frames,
+        p50=p50, p90=p90, p99=p99, max=pmax,
+        mem_growth=(mem_stop - mem_start) / n_frames
+    )
+
+def _figure(n_axes: int = 1):
+    fig = plt.figure(figsize=(8, 6), dpi=72)
+    n_cols = int(np.ceil(np.sqrt(n_axes)))
+    n_rows = int(np.ceil(n_axes / n_cols))
+    axes = [fig.add_subplot(n_rows, n_cols, i + 1) for i in range(n_axes)]
+    return fig, axes
+
+def _line(ax, n_points: int, cls=matplotlib_extras.lines.Line2D):
+    x = np.arange(n_points, dtype=np.float64)
+    line = cls(x, np.sin(x / 100.))
+    ax.add_line(line)
+    return line
+
+def case_append_data(history: int):
+    fig, (ax, ) = _figure()
+    line = _line(ax, history)
+    i = iter(range(history, sys.maxsize))
+    def frame():
+        n = next(i)
+        line.append_data(n, np.sin(n / 100.))
+    return frame
+
+def case_extend_data(history: int, chunk: int = 100):
+    fig, (ax, ) = _figure()
+    line = _line(ax, history)
+    i = iter(range(history, sys.maxsize, chunk))
+    def frame():
+        n = next(i)
+        x = np.arange(n, n + chunk, dtype=np.float64)
+        line.extend_data(x, np.sin(x / 100.))
+    return frame
+
+def case_autofit(history: int):
+    fig, (ax, ) = _figure()
+    line = _line(ax, history).autofit()
+    def frame():
+        line.refit()
+    return frame
+
+def case_blit_update(n_axes: int, history: int = 1000):
+    fig, axes = _figure(n_axes)
+    lines = [_line(ax, history) for ax in axes]
+    for line in lines:
+        line.set_animated(True)
+    bm = matplotlib_extras.animation.BlitManager(fig.canvas, lines)
+    fig.canvas.draw()
+    rng = np.random.default_rng(0)
+    def frame():
+        for line in lines:
+            line.set_ydata(rng.standard_normal(history))
+        bm.update()
+    return frame
+
+def case_animation_step(n_artists: int, n_axes: int = 4):
+    fig, axes = _figure(n_axes)
+    src = matplotlib_extras.animation.DataSource()
+    t = [0]
+    x = src(lambda: t[0])
+    rng = np.random.default_rng(0)
+    lines = []
+    for i in range(n_artists):
+        # NOTE a factory per artist (sensor): bound methods compare equal
+        line = matplotlib_extras.lines.StepFunction2D(x, src(lambda rng=rng: rng.standard_normal()))
+        axes[i % n_axes].add_line(line)
+        line.set_animated(True)
+        lines.append(line)
+    for ax in axes:
+        ax.set_xlim(0, 10_000)
+        ax.set_ylim(-5, 5)
+    anim = matplotlib_extras.animation.FigureAnimation(fig, lines, sources=[src])
+    fig.canvas.draw()
+    def frame():
+        t[0] += 1
+        anim.step()
+    return frame
+
+def case_capture(autofit: bool, n_artists: int = 4):
+    fig, (ax, ) = _figure()
+    src = matplotlib_extras.animation.DataSource()
+    t = [0]
+    x = src(lambda: t[0])
+    lines = []
+    for i in range(n_artists):
+        line = matplotlib_extras.lines.StepFunction2D(x, src(lambda i=i: i * t[0]))
+        ax.add_line(line.autofit(autofit))
+        line.set_animated(True)
+        lines.append(line)
+    anim = matplotlib_extras.animation.FigureAnimation(fig, lines, sources=[src])
+    n_draws = [0]
+    fig.canvas.mpl_connect('draw_event', lambda _: n_draws.__setitem__(0, n_draws[0] + 1))
+    fig.canvas.draw()
+    anim.capture()
+    def frame():
+        t[0] += 1
+        view, n = ax.viewLim.bounds, n_draws[0]
+        anim.step_artists()
+        anim.capture()
+        # NOTE regression check: rescaled axes need a new background (ticks)
+        if ax.viewLim.bounds != view and n_draws[0] == n:
+            raise AssertionError('axes rescaled without a full draw: stale background')
+    return frame
+
+def suite(quick: bool = False):
+    n_frames = 50 if quick else 200
+    histories = (1_000, 10_000) if quick else (1_000, 10_000, 100_000, 1_000_000)
+    for history in histories:
+        yield 'append_data', case_append_data, dict(history=history), n_frames
+        yield 'extend_data', case_extend_data, dict(history=history), n_frames
+        yield 'autofit', case_autofit, dict(history=history), n_frames
+    for n_axes in ((1, 4, 12) if quick else (1, 2, 4, 8, 12)):
+        yield 'blit_update', case_blit_update, dict(n_axes=n_axes), n_frames
+    for n_artists in ((10, 50) if quick else (10, 50, 100, 200)):
+        yield 'animation_step', case_animation_step, dict(n_artists=n_artists), n_frames
+    for autofit in (False, True):
+        yield 'capture', case_capture, dict(autofit=autofit), n_frames
+
+def report(results: typing.Sequence[Result], baseline: typing.Mapping[str, Result] = None, file=sys.stdout):
+    header = f'''{'benchmark':<40} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'mem/frame':>11}'''
+    if baseline is not None:
+        header += f''' {'p50 vs base':>12}'''
+    print(header, file=file)
+    for r in results:
+        line = (
+            f'{r.key:<40} {r.p50:>7.3f}ms {r.p90:>7.3f}ms {r.p99:>7.3f}ms {r.max:>7.3f}ms '
+            f'{r.mem_growth / 1024:>8.2f}KiB'
+        )
+        if baseline is not None and r.key in baseline:
+            line += f' {r.p50 / baseline[r.key].p50 - 1:>+11.0%}'
+        print(line, file=file)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--quick', action='store_true', help='fewer frames and sizes')
+    parser.add_argument(
+        '--repeat', type=int, default=1,
+        help='repeat each benchmark; keep the fastest (by p50) against noise'
+    )
+    parser.add_argument('--filter', default=None, help='run only the benchmarks whose name contains this')
+    parser.add_argument('--save', default=None, help='save the results (JSON) to this path')
+    parser.add_argument('--compare', default=None, help='compare against the results (JSON) at this path')
+    parser.add_argument(
+        '--tolerance', type=float, default=.25,
+        help='fail when a p50 latency regresses by more than this fraction of --compare'
+    )
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, case, params, n_frames in suite(quick=args.quick):
+        if args.filter is not None and args.filter not in name:
+            continue
+        results.append(min(
+            (measure(name, case, params, n_frames) for _ in range(args.repeat)),
+            key=lambda r: r.p50
+        ))
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = {
+                r.key: r for r in
+                (Result(**d) for d in json.load(f))
+            }
+    report(results, baseline)
+
+    if args.save is not None:
+        with open(args.save, 'w') as f:
+            json.dump([r._asdict() for r in results], f, indent=2)
+
+    if baseline is not None:
+        regressions = [
+            r.key for r in results
+                if r.key in baseline
+                and r.p50 > baseline[r.key].p50 * (1 + args.tolerance)
+        ]
+        if regressions:
+            print(f'regressions: {str.join(", ", regressions)}', file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
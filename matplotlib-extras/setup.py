@@ -13,7 +13,8 @@ setuptools.setup(
         '': 'src'
     },
     install_requires=[
-        'matplotlib>=3.7.2'
+        'matplotlib>=3.7.2',
+        'numpy'
     ],
     extras_require={
         'dev': []
@@ -1,8 +1,23 @@
+from __future__ import annotations
+
+import abc
 import typing
+import os
+import pathlib
+import shutil
+import subprocess
+import queue
+import asyncio
+import collections
+import concurrent.futures
+import threading
+import time
 
 import matplotlib
 import matplotlib.figure
 import matplotlib.artist
+import PIL.Image
+import PIL.GifImagePlugin
 
 from . import artist
 
@@ -23,6 +38,8 @@ class BlitManager:
         self.canvas = canvas
         self._bg = None
         self._artists = []
+        # TODO NOTE guards the artists against concurrent draws (e.g. `draw_event`s from the GUI)
+        self._lock = threading.RLock()
 
         for a in animated_artists:
             self.add_artist(a)
@@ -35,8 +52,9 @@ class BlitManager:
         if event is not None:
             if event.canvas != cv:
                 raise RuntimeError
-        self._bg = cv.copy_from_bbox(cv.figure.bbox)
-        self._draw_animated()
+        with self._lock:
+            self._bg = cv.copy_from_bbox(cv.figure.bbox)
+            self._draw_animated()
 
     def add_artist(self, art):
         """
@@ -70,35 +88,154 @@ class BlitManager:
         if self._bg is None:
             self.on_draw(None)
         else:
-            # restore the background
-            cv.restore_region(self._bg)
-            # draw all of the animated artists
-            self._draw_animated()
-            # update the GUI state
-            cv.blit(fig.bbox)
+            with self._lock:
+                # restore the background
+                cv.restore_region(self._bg)
+                # draw all of the animated artists
+                self._draw_animated()
+                # update the GUI state
+                cv.blit(fig.bbox)
         # let the GUI event loop process anything it has to do
         cv.flush_events()
 
+class DataSource:
+    """
+    Batched data source shared across artists.
+
+    Each registered factory (e.g. a sensor reading) is evaluated
+    once per step by `sample`, no matter how many artists refer to it.
+
+    Examples
+    --------
+    >>> src = DataSource()
+    >>> x = src(lambda: timestep)
+    >>> StepFunction2D(x, src(lambda: tmeter.value))
+    >>> StepFunction2D(x, src(lambda: tstat_cool.value))
+    >>> FigureAnimation(fig, [...])     # samples `src` each step
+    """
+
+    def __init__(self):
+        self._factories = []
+        self._index = dict()
+        self._values = []
+
+    def __call__(self, factory: typing.Callable[[], typing.Any]):
+        """
+        Register a factory.
+
+        Parameters
+        ----------
+        factory : Callable
+            The factory to sample. Registering the same factory
+            more than once yields accessors to the same sample.
+
+        Returns
+        -------
+        Callable
+            An accessor that returns the latest sample of `factory`;
+            samples it on first access if it has not been sampled yet
+            (e.g. registered after the last `sample`).
+        """
+        i = self._index.get(factory)
+        if i is None:
+            i = self._index[factory] = len(self._factories)
+            self._factories.append(factory)
+
+        def _get():
+            try: return self._values[i]
+            except IndexError: return self._sample_missing(i)
+        # NOTE for `FigureAnimation` to collect the sources its artists refer to
+        _get._data_source = self
+        return _get
+
+    def _sample_missing(self, i: int):
+        # NOTE only the factories never sampled: the others keep their latest samples
+        values = self._values
+        values.extend(f() for f in self._factories[len(values):])
+        return values[i]
+
+    def sample(self):
+        self._values = [f() for f in self._factories]
+        return self
+
 class FigureAnimation:
     def __init__(
         self,
         fig: matplotlib.figure.Figure,
-        animated_artists: typing.Collection[matplotlib.artist.Artist] = ()
+        animated_artists: typing.Collection[matplotlib.artist.Artist] = (),
+        sources: typing.Collection[DataSource] = ()
     ):
         self._blit_manager = BlitManager(
             canvas=fig.canvas,
             animated_artists=animated_artists
         )
+        self._sources = []
+        self.add_sources(*sources)
+        self._collect_sources(animated_artists)
+        # NOTE view limits of the axes at the last full draw (`capture`)
+        self._drawn_views = None
 
     def add_artists(self, *arts):
         for art in arts:
             self._blit_manager.add_artist(art)
+        self._collect_sources(arts)
         return self
 
-    def step_artists(self, *args, **kwargs):
-        for art in self._blit_manager._artists:
+    def add_sources(self, *srcs: DataSource):
+        for src in srcs:
+            if src not in self._sources:
+                self._sources.append(src)
+        return self
+
+    # TODO NOTE the sources of the step callbacks registered by the time the artists
+    # are added: those of callbacks registered later need `add_sources`
+    def _collect_sources(self, arts):
+        for art in arts:
             if not isinstance(art, artist.Artist):
                 continue
+            for _func, args_factory, kwargs_items in art._step_callbacks.keys():
+                for f in (*args_factory, *(f for _name, f in kwargs_items)):
+                    src = getattr(f, '_data_source', None)
+                    if src is not None:
+                        self.add_sources(src)
+
+    def sample_sources(self):
+        for src in self._sources:
+            src.sample()
+
+    @property
+    def _animated_artists(self) -> typing.List[artist.Artist]:
+        return [
+            art for art in self._blit_manager._artists
+                if isinstance(art, artist.Artist)
+        ]
+
+    def snapshot_artists(self):
+        """
+        Sample the data of all the animated artists without applying them.
+
+        Returns
+        -------
+        Callable
+            A thunk that applies the sampled data to the artists when called.
+        """
+        self.sample_sources()
+        applies = [art.snapshot() for art in self._animated_artists]
+
+        def _apply():
+            for f in applies:
+                f()
+        return _apply
+
+    def refit_artists(self):
+        for art in self._animated_artists:
+            if not isinstance(art, artist.FlexArtist):
+                continue
+            art.refit()
+
+    def step_artists(self, *args, **kwargs):
+        self.sample_sources()
+        for art in self._animated_artists:
             art.step(*args, **kwargs)
 
     def draw_artists(self):
@@ -108,7 +245,548 @@ class FigureAnimation:
         self.step_artists(*args, **kwargs)
         self.draw_artists()
 
+    def _views(self):
+        return {
+            ax: ax.viewLim.bounds
+                for ax in {art.axes for art in self._animated_artists}
+        }
+
+    def capture(self) -> bytes:
+        """
+        Draw a frame onto the (Agg) canvas off-screen and copy its RGBA buffer.
+
+        Only the animated artists are rasterized onto the blitted background,
+        unless their axes have been rescaled since the last full draw
+        (e.g. by `FlexArtist.autofit` when stepped).
+
+        Returns
+        -------
+        bytes
+            The RGBA buffer of the canvas.
+        """
+        blit_manager = self._blit_manager
+        cv = blit_manager.canvas
+
+        self.refit_artists()
+        views = self._views()
+        if (
+            blit_manager._bg is None
+            or views != self._drawn_views
+        ):
+            # NOTE full draw; re-grabs the background through `draw_event`
+            cv.draw()
+            self._drawn_views = views
+        else:
+            with blit_manager._lock:
+                cv.restore_region(blit_manager._bg)
+                blit_manager._draw_animated()
+        return bytes(cv.buffer_rgba())
+
+    def export(
+        self,
+        path: str | os.PathLike,
+        frames: typing.Iterable,
+        func: typing.Callable[[typing.Any], typing.Any] = None,
+        fps: float = 30.,
+        writer: 'FrameWriter' = None,
+        **writer_kwargs
+    ):
+        """
+        Export the animation headlessly.
+
+        Parameters
+        ----------
+        path : str or PathLike
+            The output file; see `FrameWriter.for_path` for the formats.
+        frames : Iterable
+            The recorded frames, one step each.
+        func : Callable, optional
+            Called with each frame before stepping, e.g. to update
+            what the artists sample.
+        fps : float
+            Frame rate of the output.
+        writer : FrameWriter, optional
+            Overrides the writer chosen from `path`.
+        **writer_kwargs
+            Passed to the writer.
+        """
+        cv = self._blit_manager.canvas
+        for attr in ('copy_from_bbox', 'restore_region', 'buffer_rgba'):
+            if not hasattr(cv, attr):
+                raise TypeError(
+                    f'canvas {cv} not supported: '
+                    'headless export requires an Agg-based canvas'
+                )
+
+        cv.draw()
+        self._drawn_views = self._views()
+        height, width, _ = cv.buffer_rgba().shape
+        if writer is None:
+            writer = FrameWriter.for_path(
+                path, size=(width, height), fps=fps,
+                **writer_kwargs
+            )
+
+        with writer:
+            for frame in frames:
+                if func is not None:
+                    func(frame)
+                self.step_artists()
+                writer.write(self.capture())
+
+        return self
+
+    def render(self, max_fps: float = 30.) -> 'Renderer':
+        """
+        Start rendering this animation off the producer (see `Renderer`).
+
+        Parameters
+        ----------
+        max_fps : float
+            Upper bound of the frame rate.
+
+        Returns
+        -------
+        Renderer
+            The started renderer; call `Renderer.submit` from the producer
+            in place of `step`.
+        """
+        return Renderer(self, max_fps=max_fps).start()
+
+class Renderer:
+    """
+    Frame-rate-limited render loop of a `FigureAnimation`.
+
+    The producer (e.g. an EnergyPlus callback) calls `submit`, which only
+    samples the artists' data and enqueues it; it never waits on drawing.
+    A background thread applies all pending samples and draws
+    at most `max_fps` times per second. Samples that arrive
+    while a frame is being drawn are coalesced into the next frame,
+    i.e. frames are dropped (but no data is) when the renderer falls behind.
+
+    GUI toolkits only allow drawing from their own thread: for GUI backends
+    (e.g. QtAgg, TkAgg), frames are drawn by a timer of the canvas instead,
+    on the GUI thread, hence only while its event loop runs
+    (e.g. the producer runs on another thread); `start` and `stop`
+    are then to be called from the GUI thread too. The background thread
+    is for the non-GUI canvases (e.g. Agg, ipympl).
+    """
+
+    def __init__(self, animation: FigureAnimation, max_fps: float = 30.):
+        self._animation = animation
+        self.max_fps = max_fps
+        self._pending = collections.deque()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._timer = None
+        self.n_frames = 0
+        self.n_dropped = 0
+
+    def submit(self):
+        # TODO NOTE `deque.append` is atomic: no lock on the producer side
+        self._pending.append(self._animation.snapshot_artists())
+        self._wakeup.set()
+        return self
+
+    def _render(self):
+        applies = []
+        try:
+            while True:
+                applies.append(self._pending.popleft())
+        except IndexError: pass
+        if not applies:
+            return False
+
+        blit_manager = self._animation._blit_manager
+        with blit_manager._lock:
+            for f in applies:
+                f()
+            self._animation.refit_artists()
+        blit_manager.update()
+
+        self.n_frames += 1
+        self.n_dropped += len(applies) - 1
+        return True
+
+    def _run(self):
+        t_next = time.monotonic()
+        while True:
+            self._wakeup.wait()
+            if self._stopping.is_set():
+                break
+            t_wait = t_next - time.monotonic()
+            if t_wait > 0 and self._stopping.wait(t_wait):
+                break
+            self._wakeup.clear()
+            t_next = time.monotonic() + 1. / self.max_fps
+            self._render()
+        # flush whatever is left
+        self._render()
+
+    def _tick(self):
+        # NOTE returns `None`: timer callbacks returning 0 (or `False`) are removed
+        self._render()
+
+    @property
+    def _gui(self):
+        canvas = self._animation._blit_manager.canvas
+        return getattr(canvas, 'required_interactive_framework', None) is not None
+
+    @property
+    def running(self):
+        return (
+            self._timer is not None
+            or self._thread is not None and self._thread.is_alive()
+        )
+
+    def start(self):
+        if self.running:
+            return self
+        if self._gui:
+            self._timer = self._animation._blit_manager.canvas.new_timer(
+                interval=1000. / self.max_fps
+            )
+            self._timer.add_callback(self._tick)
+            self._timer.start()
+            return self
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+            # flush whatever is left
+            self._render()
+            return self
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc_args):
+        self.stop()
+
+class FrameWriter(abc.ABC):
+    """
+    Encoder of raw RGBA frames.
+
+    Frames are handed over through a bounded buffer: `write` blocks
+    (i.e. throttles the renderer) only when the encoder falls behind
+    by more than `max_pending` frames.
+    """
+
+    _ffmpeg_suffixes = ('.mp4', '.mkv', '.mov', '.avi', '.webm')
+
+    @classmethod
+    def for_path(cls, path: str | os.PathLike, **kwargs) -> 'FrameWriter':
+        """
+        Choose a writer by the suffix of `path`.
+
+        - video (`.mp4`, `.mkv`, ...): `FFMpegFrameWriter`
+        - `.gif`: `FFMpegFrameWriter` if `ffmpeg` is found;
+          otherwise `PillowFrameWriter`
+        - `.png`: `PillowFrameWriter` (image sequence)
+        """
+        suffix = pathlib.Path(path).suffix.lower()
+        if suffix in cls._ffmpeg_suffixes:
+            return FFMpegFrameWriter(path, **kwargs)
+        if suffix == '.gif' and FFMpegFrameWriter.available():
+            return FFMpegFrameWriter(path, **kwargs)
+        if suffix in ('.gif', '.png'):
+            return PillowFrameWriter(path, **kwargs)
+        raise ValueError(f'unsupported format: {path}')
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        size: typing.Tuple[int, int],
+        fps: float = 30.,
+        max_pending: int = 64
+    ):
+        self.path = path
+        self.size = size
+        self.fps = fps
+        self.max_pending = max_pending
+
+    @abc.abstractmethod
+    def write(self, buf: bytes):
+        ...
+
+    @abc.abstractmethod
+    def close(self):
+        ...
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_args):
+        self.close()
+
+class FFMpegFrameWriter(FrameWriter):
+    exec_name = 'ffmpeg'
+
+    @classmethod
+    def available(cls):
+        return shutil.which(cls.exec_name) is not None
+
+    def __init__(self, *args, codec_args: typing.Sequence[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        exec_path = shutil.which(self.exec_name)
+        if exec_path is None:
+            raise FileNotFoundError(
+                f'`{self.exec_name}` binary required but not found: '
+                'make sure it is installed and in the search path'
+            )
+
+        if codec_args is None:
+            codec_args = (
+                [
+                    '-vcodec', 'libx264', '-pix_fmt', 'yuv420p',
+                    # NOTE yuv420p requires even dimensions
+                    '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2'
+                ]
+                if pathlib.Path(self.path).suffix.lower() != '.gif' else
+                []
+            )
+
+        width, height = self.size
+        self._proc = subprocess.Popen(
+            [
+                exec_path, '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                '-s', f'{width}x{height}', '-r', str(self.fps),
+                '-i', '-',
+                *codec_args,
+                str(self.path)
+            ],
+            stdin=subprocess.PIPE
+        )
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def _pump(self):
+        while (buf := self._queue.get()) is not None:
+            if self._error is not None:
+                continue
+            try: self._proc.stdin.write(buf)
+            except Exception as e:
+                self._error = e
+
+    def write(self, buf: bytes):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(buf)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._proc.stdin.close()
+        if self._proc.wait() != 0:
+            raise subprocess.CalledProcessError(
+                self._proc.returncode, self._proc.args
+            )
+        if self._error is not None:
+            raise self._error
+
+class PillowFrameWriter(FrameWriter):
+    """
+    PNG sequence or GIF writer, encoding frames in a worker pool.
+
+    For PNG sequences, `path` may be a format string of the frame
+    number, e.g. `'frames/{:06d}.png'`; otherwise the frame number
+    is appended to its stem. GIFs are streamed: each frame is written,
+    in order, once encoded; none is kept until `close`.
+    """
+
+    def __init__(self, *args, max_workers: int = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._gif = pathlib.Path(self.path).suffix.lower() == '.gif'
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers)
+        # NOTE frames in flight, in order: at most `max_pending`
+        self._futures = collections.deque()
+        self._file = None
+        self._n = 0
+
+    def _path_of(self, i: int):
+        path = str(self.path)
+        if '{' in path:
+            return path.format(i)
+        path = pathlib.Path(path)
+        return path.with_stem(f'{path.stem}-{i:06d}')
+
+    # TODO NOTE pillow releases the GIL while encoding: threads suffice
+    def _encode(self, i: int, buf: bytes) -> bytes:
+        image = PIL.Image.frombuffer('RGBA', self.size, buf, 'raw', 'RGBA', 0, 1)
+        if not self._gif:
+            image.save(self._path_of(i))
+            return b''
+        # NOTE a palette per frame: the global one (of the header) for the first,
+        # local ones for the others
+        image = image.convert('RGB').quantize()
+        duration = 1000. / self.fps
+        chunks = []
+        if i == 0:
+            header, _ = PIL.GifImagePlugin.getheader(
+                image, info=dict(loop=0, duration=duration)
+            )
+            chunks.extend(header)
+        chunks.extend(PIL.GifImagePlugin.getdata(
+            image, duration=duration, include_color_table=i > 0
+        ))
+        return b''.join(chunks)
+
+    def _flush(self, max_pending: int):
+        futures = self._futures
+        while futures and (len(futures) > max_pending or futures[0].done()):
+            data = futures.popleft().result()
+            if data:
+                if self._file is None:
+                    self._file = open(self.path, 'wb')
+                self._file.write(data)
+
+    def write(self, buf: bytes):
+        # NOTE blocks on the oldest frame if the encoders fall behind
+        self._flush(self.max_pending - 1)
+        self._futures.append(self._pool.submit(self._encode, self._n, buf))
+        self._n += 1
+
+    def close(self):
+        try:
+            self._flush(0)
+            if self._file is not None:
+                # NOTE trailer
+                self._file.write(b';')
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._futures.clear()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+# TODO NOTE ref `tqdm.asyncio.tqdm_asyncio`
+class AsyncFigureAnimation(FigureAnimation):
+    """
+    Asyncio-native `FigureAnimation`.
+
+    `step` applies the data right away and marks the figure dirty;
+    a render loop task (one per animation, started on the first `step`)
+    coalesces all the steps since its last frame into a single blit,
+    drawing at most `max_fps` times per second and yielding to the event
+    loop in between. Hence a single event loop can drive several
+    simulations and several live figures at once.
+
+    Examples
+    --------
+    >>> async with AsyncFigureAnimation(fig, artists) as anim:
+    ...     async for frame in anim.frames(source):
+    ...         ...
+    """
+
+    def __init__(
+        self,
+        fig: matplotlib.figure.Figure,
+        animated_artists: typing.Collection[matplotlib.artist.Artist] = (),
+        sources: typing.Collection[DataSource] = (),
+        max_fps: float = 30.
+    ):
+        super().__init__(fig, animated_artists=animated_artists, sources=sources)
+        self.max_fps = max_fps
+        self._dirty = None
+        self._render_task = None
+
+    def _ensure_render_task(self):
+        task = self._render_task
+        if task is not None and task.done() and not task.cancelled():
+            # NOTE a failed render loop is not restarted silently: its error is raised
+            # (once; the next `step` starts a new one)
+            self._render_task = None
+            if task.exception() is not None:
+                raise task.exception()
+        if self._render_task is None or self._render_task.done():
+            self._dirty = asyncio.Event()
+            self._render_task = asyncio.get_running_loop() \
+                .create_task(self.render_loop())
+        return self._render_task
+
+    async def render_loop(self):
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            t_next = time.monotonic() + 1. / self.max_fps
+            self.refit_artists()
+            self.draw_artists()
+            # yield to the event loop until the next frame is due
+            await asyncio.sleep(max(0., t_next - time.monotonic()))
+
+    async def step(self, *args, **kwargs):
+        self.step_artists(*args, **kwargs)
+        self._ensure_render_task()
+        self._dirty.set()
+        await asyncio.sleep(0)
+
+    async def frames(
+        self,
+        source: typing.AsyncIterable | typing.Iterable,
+        *args, **kwargs
+    ):
+        """
+        Iterate over `source`, stepping the animation after each frame.
+
+        Parameters
+        ----------
+        source : AsyncIterable or Iterable
+            The data source; each frame is yielded to the caller
+            before the artists are stepped.
+        *args, **kwargs
+            Passed to `step`.
+        """
+        if hasattr(source, '__aiter__'):
+            async for frame in source:
+                yield frame
+                await self.step(*args, **kwargs)
+        else:
+            for frame in source:
+                yield frame
+                await self.step(*args, **kwargs)
+
+    async def aclose(self):
+        if self._render_task is None:
+            return
+        self._render_task.cancel()
+        try:
+            await self._render_task
+        except asyncio.CancelledError: pass
+        self._render_task = None
+        # flush the pending frame, if any
+        if self._dirty.is_set():
+            self.refit_artists()
+            self.draw_artists()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc_args):
+        await self.aclose()
+
 __all__ = [
     BlitManager,
-    FigureAnimation
+    DataSource,
+    FigureAnimation,
+    Renderer,
+    FrameWriter,
+    FFMpegFrameWriter,
+    PillowFrameWriter,
+    AsyncFigureAnimation
 ]
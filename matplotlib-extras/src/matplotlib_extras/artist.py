@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import abc
 import typing
 import functools
@@ -11,6 +13,12 @@ class Artist(matplotlib.artist.Artist, abc.ABC):
     @functools.cached_property
     def _step_callbacks(self):
         class _Callbacks(utils.containers.OrderedSetDict):
+            class Entry(typing.NamedTuple):
+                # call the callback with freshly sampled data
+                call: typing.Callable[[], typing.Any]
+                # sample the data; return a thunk that calls the callback with it
+                sample: typing.Callable[[], typing.Callable[[], typing.Any]]
+
             @classmethod
             def _entry_encode(cls, func, *args, **kwargs):
                 return tuple(
@@ -21,35 +29,73 @@ class Artist(matplotlib.artist.Artist, abc.ABC):
                 self._func_resolver = func_resolver
                 super().__init__(*args, **kwargs)
 
-            def add(self, func, *args, **kwargs):
-                return super().add(
-                    self.__class__._entry_encode(func, *args, **kwargs)
+            def _func_handler(self, f):
+                if self._func_resolver is not None:
+                    return self._func_resolver(f)
+                if callable(f): return f
+                raise TypeError
+
+            # TODO NOTE the callbacks are compiled at registration time:
+            # no name resolution nor factory dispatch is left for each step
+            def _entry_compile(self, func, *args_factory, **kwargs_factory):
+                f = self._func_handler(func)
+                partial = functools.partial
+
+                if kwargs_factory:
+                    kwargs_items = tuple(kwargs_factory.items())
+                    def _sample():
+                        return partial(
+                            f,
+                            *(f_args() for f_args in args_factory),
+                            **{name: f_kwargs() for name, f_kwargs in kwargs_items}
+                        )
+                    return self.Entry(call=lambda: _sample()(), sample=_sample)
+
+                if len(args_factory) == 0:
+                    return self.Entry(call=f, sample=lambda: f)
+
+                if len(args_factory) == 1:
+                    f_arg, = args_factory
+                    return self.Entry(
+                        call=lambda: f(f_arg()),
+                        sample=lambda: partial(f, f_arg())
+                    )
+
+                return self.Entry(
+                    call=lambda: f(*[f_args() for f_args in args_factory]),
+                    sample=lambda: partial(f, *[f_args() for f_args in args_factory])
                 )
 
+            def add(self, func, *args, **kwargs):
+                self[self.__class__._entry_encode(func, *args, **kwargs)] \
+                    = self._entry_compile(func, *args, **kwargs)
+
             def remove(self, func, *args, **kwargs):
                 return super().remove(
                     self.__class__._entry_encode(func, *args, **kwargs)
                 )
 
+            # TODO NOTE evaluates the args/kwargs factories (i.e. samples the data) now
+            # but defers the callbacks: the returned thunk may be called from another thread
+            def snapshot(self):
+                calls = [entry.sample() for entry in self.values()]
+
+                def _apply():
+                    for f in calls:
+                        f()
+                return _apply
+
             def __call__(self):
-                def _func_handler(f):
-                    nonlocal self
-                    if callable(f): return f
-                    if self._func_resolver is not None:
-                        return self._func_resolver(f)
-                    raise TypeError
-
-                return {
-                    key: _func_handler(f).__call__(
-                        *(f_args() for f_args in args_factory),
-                        **{name: f_kwargs() for name, f_kwargs in kwargs_factory}
-                    ) for key, (f, args_factory, kwargs_factory) in self.items()
-                }
-
-        return _Callbacks(
-            # NOTE instance method needs to be unbounded hence the `.__func__`
-            func_resolver=lambda name: getattr(self, name).__func__
-        )
+                for entry in self.values():
+                    entry.call()
+
+        def _func_resolver(f):
+            if isinstance(f, str):
+                return getattr(self, f)
+            return functools.partial(f, self)
+
+        # NOTE callbacks are bound to this instance
+        return _Callbacks(func_resolver=_func_resolver)
 
     # TODO NOTE format: <instance_method_name>, <args_factory>
     # TODO NOTE example: .on_step('set_data', lambda: [1, 2, 3])
@@ -61,11 +107,21 @@ class Artist(matplotlib.artist.Artist, abc.ABC):
     ):
         self._step_callbacks.add(
             callback,
-            lambda: self,
             *args_factory, **kwargs_factory
         )
         return self
 
+    def snapshot(self) -> typing.Callable[[], typing.Any]:
+        """
+        Sample the data of the step callbacks without applying them.
+
+        Returns
+        -------
+        Callable
+            A thunk that applies the sampled data to this artist when called.
+        """
+        return self._step_callbacks.snapshot()
+
     def step(self):
         self._step_callbacks()
 
@@ -74,11 +130,14 @@ class FlexArtist(Artist):
         self._autofit = enable
         return self
 
-    def step(self, *args, **kwargs):
-        res = super().step(*args, **kwargs)
+    def refit(self):
         if getattr(self, '_autofit', False):
             self.axes.relim()
             self.axes.autoscale_view()
+
+    def step(self, *args, **kwargs):
+        res = super().step(*args, **kwargs)
+        self.refit()
         return res
 
 __all__ = [
@@ -1,14 +1,60 @@
 import typing
 
+import numpy as np
 import matplotlib.lines
 
 from . import artist
 
 
+# TODO NOTE capacity-doubling array: appends are amortized O(1);
+# `view` is only ever written to beyond its end, i.e. never changes once handed out
+class _GrowableArray:
+    __slots__ = ('_array', '_n', 'view')
+
+    def __init__(self, data):
+        data = np.asarray(data)
+        self._array = data.copy()
+        self._n = len(data)
+        self.view = self._array
+
+    def extend(self, data) -> np.ndarray:
+        data = np.asarray(data)
+        n = self._n + len(data)
+        dtype = np.result_type(self._array, data)
+        if n > len(self._array) or dtype != self._array.dtype:
+            array = np.empty(max(n, 2 * len(self._array)), dtype=dtype)
+            array[:self._n] = self._array[:self._n]
+            self._array = array
+        self._array[self._n:n] = data
+        self._n = n
+        self.view = self._array[:n]
+        return self.view
+
 class Line2D(matplotlib.lines.Line2D, artist.FlexArtist):
     def __init__(self, xdata=[], ydata=[], **kwargs):
         return super().__init__(xdata, ydata, **kwargs)
 
+    def _data_buffers(self, orig=True):
+        # NOTE (re)started from the current data unless it is still that of the buffers
+        # (e.g. after `set_data`)
+        buffers = getattr(self, '_buffers', None)
+        if (
+            buffers is None
+            or self._xorig is not buffers[0].view
+            or self._yorig is not buffers[1].view
+        ):
+            buffers = self._buffers = tuple(
+                _GrowableArray(data) for data in self.get_data(orig=orig)
+            )
+        return buffers
+
+    # TODO NOTE `set_data` copies the data (`copy.copy`):
+    # the views of the buffers are handed over as they are instead
+    def _set_data_views(self, xdata, ydata):
+        self._xorig, self._yorig = xdata, ydata
+        self._invalidx = self._invalidy = True
+        self.stale = True
+
     def extend_data(self, *datas, orig=True):
         """
         Extend the x and y data.
@@ -23,11 +69,12 @@ class Line2D(matplotlib.lines.Line2D, artist.FlexArtist):
         """
 
         # TODO NOTE datas: tuple of 1d arrays: (<xdata>, <ydata>, ...)
+        # NOTE appended to the buffers as arrays: chunks are never iterated element-wise
         def _impl(datas, orig):
-            self.set_data(*(
-                [*old_data, *data]
-                for old_data, data in
-                zip(self.get_data(orig=orig), datas)
+            self._set_data_views(*(
+                buffer.extend(data)
+                for buffer, data in
+                zip(self._data_buffers(orig=orig), datas)
             ))
 
         if len(datas) == 1:
@@ -0,0 +1,149 @@
+import typing
+import time
+
+import numpy as np
+
+from . import animation, lines
+
+
+class Replay:
+    """
+    Replay of recorded columnar data (e.g. EMS values) into artists.
+
+    The data is any mapping of column names to 1D arrays:
+    a `pandas.DataFrame`, a `dict` of (memory-mapped) `numpy` arrays, etc.
+    Playback advances `rate` rows per frame, feeding each artist
+    the chunk through a single `extend_data` call.
+
+    Examples
+    --------
+    >>> replay = (
+    ...     Replay(anim, df, rate=60)
+    ...         .bind(line_temp, 'timestep', 'People Air Temperature')
+    ...         .bind(line_elec, 'timestep', 'Electricity:Zone:CORE_MID')
+    ... )
+    >>> replay.seek(1000).play(fps=30)
+    >>> anim.export('replay.mp4', replay.frames())
+    """
+
+    def __init__(
+        self,
+        animation: animation.FigureAnimation,
+        data: typing.Mapping[str, typing.Sequence],
+        rate: int = 1
+    ):
+        self._animation = animation
+        self._data = data
+        self._bindings: typing.List[
+            typing.Tuple[lines.Line2D, typing.Tuple[np.ndarray, ...]]
+        ] = []
+        self.rate = rate
+        self._position = 0
+
+    def _column(self, name: str) -> np.ndarray:
+        col = self._data[name]
+        # NOTE `pandas` objects; `numpy.memmap` passes through without copying
+        if hasattr(col, 'to_numpy'):
+            col = col.to_numpy()
+        return np.asanyarray(col)
+
+    def bind(self, art: lines.Line2D, *columns: str):
+        """
+        Bind the columns to an artist.
+
+        Parameters
+        ----------
+        art : Line2D
+            The artist to feed; it is reset to the current position.
+        *columns : str
+            The column names to feed, in the order of `Line2D.set_data`,
+            i.e. `<xdata>, <ydata>`.
+        """
+        cols = tuple(self._column(name) for name in columns)
+        self._bindings.append((art, cols))
+        art.set_data(*(col[:self._position] for col in cols))
+        return self
+
+    def __len__(self):
+        return min(
+            (len(col) for _, cols in self._bindings for col in cols),
+            default=0
+        )
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def seek(self, position: int):
+        """
+        Jump to a row, forwards or backwards.
+
+        Parameters
+        ----------
+        position : int
+            The number of rows replayed so far; negative values
+            count from the end.
+        """
+        position = range(len(self) + 1)[position]
+        for art, cols in self._bindings:
+            art.set_data(*(col[:position] for col in cols))
+        self._position = position
+        return self
+
+    def fast_forward(self, n: int):
+        return self.advance(n)
+
+    def advance(self, n: int = None) -> bool:
+        """
+        Feed the next chunk of rows to the artists.
+
+        Parameters
+        ----------
+        n : int, optional
+            Number of rows; defaults to `rate`.
+
+        Returns
+        -------
+        bool
+            Whether any row was fed.
+        """
+        if n is None:
+            n = self.rate
+        start = self._position
+        stop = min(start + n, len(self))
+        if stop <= start:
+            return False
+        for art, cols in self._bindings:
+            art.extend_data(*(col[start:stop] for col in cols))
+        self._position = stop
+        return True
+
+    def frames(self) -> typing.Iterator[int]:
+        """
+        Advance by `rate` rows per iteration until the end.
+
+        Yields
+        ------
+        int
+            The position after each chunk.
+        """
+        while self.advance():
+            yield self._position
+
+    def play(self, fps: float = 30.):
+        """
+        Play in (roughly) real time: `rate * fps` rows per second.
+        """
+        t_next = time.monotonic()
+        for _ in self.frames():
+            self._animation.refit_artists()
+            self._animation.draw_artists()
+            t_next += 1. / fps
+            t_wait = t_next - time.monotonic()
+            if t_wait > 0:
+                time.sleep(t_wait)
+        return self
+
+__all__ = [
+    Replay
+]